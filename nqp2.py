@@ -3,6 +3,7 @@ import cProfile
 import timeit
 import json
 import logging
+import multiprocessing
 import pytweening
 import statistics
 import pygame
@@ -10,4 +11,8 @@ from pygame.locals import *
 
 from scripts import __main__
 
-__main__.main()
+# N.B. worker processes, e.g. for the win preview, import this module. Without the guard each would start the game.
+if __name__ == "__main__":
+    # lets worker processes start from the packaged executable
+    multiprocessing.freeze_support()
+    __main__.main()
@@ -35,6 +35,7 @@ def main():
         traceback.print_exc()
 
     # we've left the game loop so now close everything down
+    game.combat.win_preview.shutdown()
     if game.debug.is_logging:
         game.debug.kill_logging()
         # print debug values
@@ -0,0 +1,176 @@
+"""
+Simulate every unit against every other unit and record how often each wins and how long it takes to win.
+
+Run from the project root, e.g. `python -m scripts.balance --fights 10 --factions swarm wasters --output balance`.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+from scripts.scenes.combat.elements.troupe import Troupe
+from scripts.scenes.combat.headless import HeadlessGame, MAX_COMBAT_DURATION
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Tuple
+
+__all__ = ["simulate_matchup", "run_matchups", "main"]
+
+
+_worker_game: Optional[HeadlessGame] = None  # each worker process keeps its own game to simulate with
+
+
+def _init_worker():
+    global _worker_game
+
+    # only warnings and above, as Data logs every file it loads
+    logging.basicConfig(level=logging.WARNING)
+    _worker_game = HeadlessGame()
+
+
+def simulate_matchup(unit_type: str, opponent_type: str, fights: int, max_duration: float) -> Dict[str, Any]:
+    """
+    Simulate a number of seeded fights between a single unit of each type, in a worker process. The first unit is on
+    the player's team.
+    """
+    game = _worker_game
+    player_troupe = Troupe(game, "player", [])
+    player_troupe.generate_specific_units([unit_type])
+    enemy_troupe = Troupe(game, "enemy", [])
+    enemy_troupe.generate_specific_units([opponent_type])
+
+    wins = 0
+    losses = 0
+    win_durations = []
+    for seed in range(fights):
+        result = game.combat.simulate(player_troupe, enemy_troupe, seed=seed, max_duration=max_duration)
+        if result["winner"] == "player":
+            wins += 1
+            win_durations.append(result["duration"])
+        elif result["winner"] == "enemy":
+            losses += 1
+
+    return {
+        "unit": unit_type,
+        "opponent": opponent_type,
+        "fights": fights,
+        "wins": wins,
+        "losses": losses,
+        "draws": fights - wins - losses,
+        "win_rate": wins / fights,
+        "time_to_kill": statistics.mean(win_durations) if win_durations else None,
+    }
+
+
+def _simulate_matchup_safely(args: Tuple[str, str, int, float]) -> Dict[str, Any]:
+    """
+    As simulate_matchup, but failures are recorded rather than stopping the whole run.
+    """
+    unit_type, opponent_type, fights, max_duration = args
+    try:
+        return simulate_matchup(unit_type, opponent_type, fights, max_duration)
+    except Exception as exception:
+        logging.warning(f"Balance: {unit_type} vs {opponent_type} failed. {exception}")
+        return {"unit": unit_type, "opponent": opponent_type, "fights": fights, "error": str(exception)}
+
+
+def run_matchups(
+    unit_types: List[str],
+    fights: int,
+    workers: Optional[int] = None,
+    max_duration: float = MAX_COMBAT_DURATION,
+) -> List[Dict[str, Any]]:
+    """
+    Simulate every ordered pair of unit types, spread across worker processes. Returns a result per matchup, in the
+    order of the pairs.
+    """
+    matchups = [
+        (unit_type, opponent_type, fights, max_duration)
+        for unit_type, opponent_type in itertools.product(unit_types, repeat=2)
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    # hand out work in batches, as each matchup is quick compared to sending it to a process
+    chunk_size = max(1, len(matchups) // (workers * 8))
+
+    results = []
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        for result in executor.map(_simulate_matchup_safely, matchups, chunksize=chunk_size):
+            results.append(result)
+            if len(results) % 100 == 0 or len(results) == len(matchups):
+                elapsed = time.time() - start_time
+                print(f"{len(results)}/{len(matchups)} matchups simulated in {format(elapsed, '.1f')}s.")
+
+    return results
+
+
+def _write_matrix(path: str, unit_types: List[str], results: List[Dict[str, Any]], key: str):
+    """
+    Write one value from each result as a CSV grid, with a row per unit and a column per opponent.
+    """
+    values = {(result["unit"], result["opponent"]): result.get(key) for result in results}
+
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["unit"] + unit_types)
+        for unit_type in unit_types:
+            row = [values.get((unit_type, opponent_type)) for opponent_type in unit_types]
+            writer.writerow([unit_type] + ["" if value is None else value for value in row])
+
+
+def write_results(output: str, unit_types: List[str], results: List[Dict[str, Any]]):
+    """
+    Write the win rate and time to kill grids as CSV, and every result as JSON.
+    """
+    _write_matrix(f"{output}_win_rate.csv", unit_types, results, "win_rate")
+    _write_matrix(f"{output}_time_to_kill.csv", unit_types, results, "time_to_kill")
+
+    with open(f"{output}.json", "w") as file:
+        json.dump({"units": unit_types, "matchups": results}, file, indent=4)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Simulate every pair of units and record the results.")
+    parser.add_argument("--fights", type=int, default=5, help="fights per matchup, each with its own seed")
+    parser.add_argument("--factions", nargs="*", help="only include units from these factions")
+    parser.add_argument("--tiers", nargs="*", type=int, help="only include units of these tiers")
+    parser.add_argument("--units", nargs="*", help="only include these unit types")
+    parser.add_argument("--workers", type=int, help="number of processes to use. Defaults to one per core.")
+    parser.add_argument(
+        "--max-duration", type=float, default=MAX_COMBAT_DURATION, help="seconds before a fight is a draw"
+    )
+    parser.add_argument("--output", default="balance", help="path, without extension, to write results to")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    # load the data without a window
+    data = HeadlessGame().data
+    unit_types = [
+        unit["type"]
+        for unit in data.units.values()
+        if (not args.factions or unit["faction"] in args.factions)
+        and (not args.tiers or unit["tier"] in args.tiers)
+        and (not args.units or unit["type"] in args.units)
+    ]
+    if not unit_types:
+        print("No units match the filters given.")
+        return
+
+    print(f"Simulating {len(unit_types) ** 2} matchups of {args.fights} fights between {len(unit_types)} units.")
+    results = run_matchups(unit_types, args.fights, args.workers, args.max_duration)
+    write_results(args.output, unit_types, results)
+    print(f"Results written to {args.output}_win_rate.csv, {args.output}_time_to_kill.csv and {args.output}.json.")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,21 @@ from __future__ import annotations
 
 import json
 import logging
+import math
 import os
 import time
 from typing import TYPE_CHECKING
 
 import pygame
 
-from scripts.core.constants import ASSET_PATH, DEFAULT_IMAGE_SIZE, FontEffects, FontType
+from scripts.core.constants import (
+    ASSET_PATH,
+    DEFAULT_IMAGE_SIZE,
+    FontEffects,
+    FontType,
+    ROTATED_IMAGE_CACHE_SIZE,
+    ROTATION_STEPS,
+)
 from scripts.core.utility import clamp
 from scripts.ui_elements.fancy_font import FancyFont
 from scripts.ui_elements.font import Font
@@ -71,6 +79,15 @@ class Assets:
             for unit in os.listdir(ASSET_PATH / "units/")
         }
 
+        # the same frames, facing left
+        self.flipped_unit_animations = {
+            unit: {
+                action: [pygame.transform.flip(frame, True, False) for frame in frames]
+                for action, frames in actions.items()
+            }
+            for unit, actions in self.unit_animations.items()
+        }
+
         self.trap_animations = {
             trap: self.load_image_dir(ASSET_PATH / "traps/" / trap) for trap in os.listdir(ASSET_PATH / "traps/")
         }
@@ -114,6 +131,9 @@ class Assets:
             if projectiles_image.split(".")[-1] == "png"
         }
 
+        # rotated projectile images, by image name and angle step. Filled as needed.
+        self.rotated_projectiles: Dict[Tuple[str, int], pygame.Surface] = {}
+
         self.maps = {map.split(".")[0]: json_read("data/maps/" + map) for map in os.listdir("data/maps")}
 
         # record duration
@@ -182,6 +202,27 @@ class Assets:
         else:
             return image
 
+    def get_rotated_projectile(self, image_name: str, angle: float) -> pygame.Surface:
+        """
+        Get the projectile image rotated to face along the angle, in radians. Angles are snapped to one of
+        ROTATION_STEPS, so that rotated images can be shared.
+
+        N.B. the image is shared, so don't modify it.
+        """
+        step = round(angle / (math.pi * 2) * ROTATION_STEPS) % ROTATION_STEPS
+        key = (image_name, step)
+
+        image = self.rotated_projectiles.get(key)
+        if image is None:
+            # drop the oldest
+            if len(self.rotated_projectiles) >= ROTATED_IMAGE_CACHE_SIZE:
+                del self.rotated_projectiles[next(iter(self.rotated_projectiles))]
+
+            image = pygame.transform.rotate(self.projectiles[image_name], -step * 360 / ROTATION_STEPS)
+            self.rotated_projectiles[key] = image
+
+        return image
+
     def create_font(self, font_type: FontType, text: str, pos: Tuple[int, int] = (0, 0), line_width: int = 0) -> Font:
         """
         Create a font instance.
@@ -15,6 +15,10 @@ SAVE_PATH = DATA_PATH / "saves/"
 DEBUGGING_PATH = ROOT_PATH / ".debug"
 LOGGING_PATH = DEBUGGING_PATH / "logging"
 PROFILING_PATH = DEBUGGING_PATH / "profiling"
+REPLAY_PATH = DEBUGGING_PATH / "replays"
+
+# timing
+MAX_FRAME_DT = 0.1  # longest time, in seconds, a frame is treated as taking, so a stall doesn't become one huge update
 
 # sizes
 DEFAULT_IMAGE_SIZE = 16
@@ -25,6 +29,19 @@ WEIGHT_SCALE = 5
 DEFENSE_SCALE = 10
 PUSH_FORCE = 14
 
+# combat
+COMBAT_STEP = 1 / 60  # duration, in seconds, of a single fixed combat tick
+MAX_COMBAT_STEP_TIME = 1 / 30  # seconds of real time a frame can spend on ticks before the rest of its time is dropped
+FAST_FORWARD_SPEEDS = [1, 2, 4, 8]  # combat speeds that can be chosen while watching
+FAST_FORWARD_RENDER_INTERVAL = 2  # frames between redraws of the combat while fast forwarding
+INSTANT_RESOLVE_BUDGET = 5  # max seconds of real time to spend resolving a combat instantly
+REPLAY_KEYFRAME_INTERVAL = 2  # seconds of combat between the full snapshots saved in replays, used to seek
+MAX_SAVED_REPLAYS = 20  # number of replays kept in the replay folder. Older ones are deleted.
+
+# caches
+ROTATION_STEPS = 128  # number of angles, evenly spaced, that rotated images are snapped to
+ROTATED_IMAGE_CACHE_SIZE = 1024  # max number of rotated images to hold
+
 # other
 DAYS_UNTIL_BOSS = 30
 
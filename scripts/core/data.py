@@ -4,6 +4,7 @@ import json
 import logging
 import os
 import time
+from types import MappingProxyType
 from typing import Any, TYPE_CHECKING, Union
 
 from scripts.core.constants import DATA_PATH
@@ -52,12 +53,14 @@ class Data:
         tile_info_raw = json.load(f)
         f.close()
 
-        # convert tile IDs to tuples (JSON doesn't allow tuples)
+        # convert tile IDs to tuples (JSON doesn't allow tuples) and resolve each config against the default, once, so
+        # all tiles of a type can share it. N.B. configs are read only.
+        default = tile_info_raw["default|0|0"]
         tile_info = {}
         for tile_id in tile_info_raw:
             tile_info[
                 tuple([id_section if i == 0 else int(id_section) for i, id_section in enumerate(tile_id.split("|"))])
-            ] = tile_info_raw[tile_id]
+            ] = MappingProxyType({**default, **tile_info_raw[tile_id]})
 
         logging.debug(f"Data: All tileset data loaded.")
 
@@ -11,7 +11,15 @@ import time
 import timeit
 from typing import TYPE_CHECKING
 
-from scripts.core.constants import DEBUGGING_PATH, FontType, INFINITE, LOGGING_PATH, PROFILING_PATH, VERSION
+from scripts.core.constants import (
+    DEBUGGING_PATH,
+    FontType,
+    INFINITE,
+    LOGGING_PATH,
+    PROFILING_PATH,
+    REPLAY_PATH,
+    VERSION,
+)
 from scripts.ui_elements.dev_console import DevConsole
 
 if TYPE_CHECKING:
@@ -47,6 +55,7 @@ class Debugger:
         self.is_fps_visible: bool = False
         self.is_profiling: bool = True
         self.is_logging: bool = True
+        self.is_saving_replays: bool = True  # write a replay of each finished combat
         self.debug_mode: bool = False
 
         # values
@@ -118,6 +127,10 @@ class Debugger:
         if not os.path.isdir(logging_path):
             os.mkdir(logging_path + "/")
 
+        replay_path = str(REPLAY_PATH)
+        if not os.path.isdir(replay_path):
+            os.mkdir(replay_path + "/")
+
     def toggle_dev_console_visibility(self):
         if self._dev_console is None:
             self._dev_console = DevConsole(self.game)
@@ -32,6 +32,7 @@ class Input:
             "select": False,
             "cancel": False,
             "view_troupe": False,
+            "fast_forward": False,
             "shift": False,
             "backspace": False,
             "toggle_dev_console": False,
@@ -194,6 +195,9 @@ class Input:
                     if event.key == K_v:
                         self.states["view_troupe"] = True
 
+                    if event.key == K_f:
+                        self.states["fast_forward"] = True
+
                 if event.type == KEYUP:
                     if event.key == K_RIGHT:
                         self.states["hold_right"] = False
@@ -7,6 +7,8 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from typing import Dict
+
     from scripts.core.game import Game
 
 
@@ -14,6 +16,11 @@ __all__ = ["RNG"]
 
 
 class RNG(random.Random):
+    """
+    The game's seeded randomness. Also holds named child streams, each seeded from a stream seed and its name, so that
+    a subsystem drawing more or fewer values doesn't change what any other subsystem gets.
+    """
+
     def __init__(self, game: Game):
         # start timer
         start_time = time.time()
@@ -21,6 +28,15 @@ class RNG(random.Random):
         super().__init__()
 
         self.current_seed = 0
+        self.stream_seed = 0  # seed the child streams were last seeded from
+
+        self._streams: Dict[str, random.Random] = {}
+
+        # child streams for combat. Gameplay decides outcomes, terrain builds the map and cosmetic is for anything that
+        # is only seen, so can differ between a windowed and a headless combat.
+        self.gameplay: random.Random = self.get_stream("gameplay")
+        self.terrain: random.Random = self.get_stream("terrain")
+        self.cosmetic: random.Random = self.get_stream("cosmetic")
 
         # record duration
         end_time = time.time()
@@ -32,8 +48,30 @@ class RNG(random.Random):
         """
         self.seed(seed)
         self.current_seed = seed
+        self.seed_streams(seed)
         logging.info(f"Seed set to {seed}.")
 
+    def seed_streams(self, seed: int):
+        """
+        Reseed all child streams from the seed, without affecting the main sequence.
+        """
+        self.stream_seed = seed
+        for name, stream in self._streams.items():
+            stream.seed(self._get_stream_seed(name))
+
+    def get_stream(self, name: str) -> random.Random:
+        """
+        Get the child stream with the given name. Created, and seeded from the stream seed, if it doesn't exist.
+        """
+        if name not in self._streams:
+            self._streams[name] = random.Random(self._get_stream_seed(name))
+
+        return self._streams[name]
+
+    def _get_stream_seed(self, name: str) -> str:
+        # N.B. str seeds are hashed with sha512 so are the same in every process, unlike hash()
+        return f"{self.stream_seed}:{name}"
+
     def roll(self, min_value: int = 0, max_value: int = 99) -> int:
         """
         Roll for a number between min and max. Can handle negative numbers.
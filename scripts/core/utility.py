@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import List, TypeVar
+from typing import List, Tuple, TypeVar
 
 import pygame
 
@@ -9,7 +9,7 @@ from scripts.core.constants import NodeType, SceneType
 
 _V = TypeVar("_V", int, float)  # to represent where we don't know which type is being used
 
-__all__ = ["swap_colour", "clip", "offset", "lerp", "clamp", "itr", "scene_to_scene_type"]
+__all__ = ["swap_colour", "clip", "offset", "lerp", "clamp", "itr", "convex_hull", "scene_to_scene_type"]
 
 
 def swap_colour(img, old_c, new_c):
@@ -66,6 +66,34 @@ def itr(iterable):
     return sorted(enumerate(iterable), reverse=True)
 
 
+def convex_hull(points: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """
+    Get the corners of the smallest convex polygon containing all points, in order. Points on an edge are dropped.
+    """
+    points = sorted(set(points))
+    if len(points) < 3:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    # build the lower and upper halves, each from left to right
+    lower = []
+    for point in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], point) <= 0:
+            lower.pop()
+        lower.append(point)
+
+    upper = []
+    for point in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], point) <= 0:
+            upper.pop()
+        upper.append(point)
+
+    # the ends of each half are the start of the other
+    return lower[:-1] + upper[:-1]
+
+
 def scene_to_scene_type(scene) -> SceneType:
     """
     Take a Scene and return the relevant SceneType
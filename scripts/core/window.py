@@ -6,6 +6,8 @@ from typing import TYPE_CHECKING
 
 import pygame
 
+from scripts.core.constants import MAX_FRAME_DT
+
 if TYPE_CHECKING:
     from typing import List, Tuple, Union
 
@@ -41,7 +43,7 @@ class Window:
         pygame.display.update()
         self.display.fill((0, 0, 0))
 
-        self.dt = time.time() - self.frame_start
+        self.dt = min(time.time() - self.frame_start, MAX_FRAME_DT)
         self.frame_start = time.time()
 
     @property
@@ -44,4 +44,4 @@ class EnemyCombatantsGenerator:
             unit = self.enemy_troupe.units[id_]
 
             unit.pos = positions.pop(0)
-            self.game.combat.units.add_unit_to_combat(unit)
+            self.game.combat.add_unit(unit)
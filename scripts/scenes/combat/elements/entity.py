@@ -1,10 +1,9 @@
 import math
-import random
 from typing import TYPE_CHECKING
 
 import pygame
 
-from scripts.core.constants import DEFENSE_SCALE, PUSH_FORCE, WEIGHT_SCALE
+from scripts.core.constants import DEFENSE_SCALE
 from scripts.core.utility import offset
 
 if TYPE_CHECKING:
@@ -44,6 +43,7 @@ class Entity:
         # animation stuff
         self.action = "walk"
         self.frame_timer = 0
+        self._frames = None  # current frame facing right and facing left. Found when first needed after a change.
 
         self.behaviour = self.game.data.behaviours.entity_behaviours[self.unit.default_behaviour](self)
 
@@ -60,12 +60,20 @@ class Entity:
         self.is_attacking = False
 
         # slightly adjust position so the initial spread is round
-        self.pos[0] += random.random() * 0.1 - 0.05  # don't use seeded rng
-        self.pos[1] += random.random() * 0.1 - 0.05  # don't use seeded rng
+        self.pos[0] += self.game.rng.gameplay.random() * 0.1 - 0.05
+        self.pos[1] += self.game.rng.gameplay.random() * 0.1 - 0.05
+
+        self.prev_pos = self.pos.copy()  # position at the start of the latest tick
 
         # temp
         self.colour = self.unit.colour
 
+    def __getstate__(self):
+        # images can't be pickled, and frames are found again when next drawn
+        state = self.__dict__.copy()
+        state["_frames"] = None
+        return state
+
     def move(self, movement):
         """
         Splits the movement operation into smaller amounts to prevent issues with high speed movement.
@@ -130,7 +138,11 @@ class Entity:
                 self.action = "hit"
                 self.frame_timer = 0
 
-            self.game.combat.particles.create_particle_burst(self.pos.copy(), (255, 50, 100), random.randint(10, 16))
+            self._frames = None
+
+            self.game.combat.particles.create_particle_burst(
+                self.pos.copy(), (255, 50, 100), self.game.rng.cosmetic.randint(10, 16)
+            )
 
             self.damaged_by_log = (self.damaged_by_log + [owner])[-30:]
 
@@ -171,6 +183,7 @@ class Entity:
         self.attack_timer = max(0, self.attack_timer - dt)
 
         start_pos = self.pos.copy()
+        self.prev_pos = start_pos
 
         # make sure the attack action can be transferred after movement
         self.is_attacking = False
@@ -196,39 +209,7 @@ class Entity:
             if self.is_attacking:
                 self.action = "attack"
 
-        # handle collision
-        if self.alive:
-            for entity in self.game.combat.all_entities:
-                if (entity != self) and (entity.alive):
-                    combined_size = self.size + entity.size
-                    # horizontal scan
-                    if abs(entity.pos[0] - self.pos[0]) < combined_size:
-                        # vertical scan
-                        if abs(entity.pos[1] - self.pos[1]) < combined_size:
-                            # full check instead of rough
-                            dis = self.dis(entity)
-                            if dis < combined_size:
-                                # push both (pushing gets doubled)
-                                angle = self.angle(entity)
-                                force = 1 - dis / combined_size
-                                entity.advance(
-                                    angle,
-                                    (self.weight + WEIGHT_SCALE)
-                                    / (entity.weight + WEIGHT_SCALE)
-                                    * dt
-                                    * PUSH_FORCE
-                                    * force,
-                                )
-                                self.advance(
-                                    angle + math.pi,
-                                    (entity.weight + WEIGHT_SCALE)
-                                    / (self.weight + WEIGHT_SCALE)
-                                    * dt
-                                    * PUSH_FORCE
-                                    * force,
-                                )
-                                entity.pushed_by_log = (entity.pushed_by_log + [self])[-30:]
-                                self.pushed_log = (self.pushed_log + [entity])[-30:]
+        self._frames = None
 
     @property
     def cycle_length(self):
@@ -248,32 +229,65 @@ class Entity:
     def animation_frames(self):
         return len(self.game.assets.unit_animations[self.type][self.action])
 
+    @property
+    def frames(self):
+        """
+        The current animation frame, as (facing right, facing left).
+        """
+        if self._frames is None:
+            frame = int(self.frame_timer / self.cycle_length * self.animation_frames) % self.animation_frames
+
+            assets = self.game.assets
+            try:
+                self._frames = (
+                    assets.unit_animations[self.type][self.action][frame],
+                    assets.flipped_unit_animations[self.type][self.action][frame],
+                )
+            except KeyError:
+                img = pygame.Surface((self.size * 2, self.size * 2))
+                self._frames = (img, img)
+
+        return self._frames
+
     @property
     def img(self):
-        frame = int(self.frame_timer / self.cycle_length * self.animation_frames) % self.animation_frames
+        return self.frames[0]
 
-        try:
-            img = self.game.assets.unit_animations[self.type][self.action][frame]
-        except KeyError:
-            img = pygame.Surface((self.size * 2, self.size * 2))
+    @property
+    def depth(self):
+        """
+        Where the entity is drawn relative to others. Entities with a greater depth are drawn over those with less.
+        """
+        return self.pos[1] + self.img.get_height() // 2
 
-        return img
+    def lerp_pos(self, alpha):
+        """
+        Get the position part way, by alpha, from where the entity was at the start of the latest tick to where it is.
+        """
+        return [
+            self.prev_pos[0] + (self.pos[0] - self.prev_pos[0]) * alpha,
+            self.prev_pos[1] + (self.pos[1] - self.prev_pos[1]) * alpha,
+        ]
 
-    def render(self, surface: pygame.Surface, shift=(0, 0)):
+    def get_blit(self, shift=(0, 0), alpha=1):
+        """
+        Get the current frame and where to draw it, ready to pass to Surface.blits.
+        """
+        img = self.frames[self.pos_change[0] < 0]
+        pos = self.lerp_pos(alpha)
+        return (
+            img,
+            (
+                pos[0] + shift[0] - img.get_width() // 2,
+                pos[1] + shift[1] - img.get_height(),
+            ),
+        )
+
+    def render(self, surface: pygame.Surface, shift=(0, 0), alpha=1):
         if self.type in self.game.assets.unit_animations:
-            flip = False
-            if self.pos_change[0] < 0:
-                flip = True
-
-            surface.blit(
-                pygame.transform.flip(self.img, flip, False),
-                (
-                    self.pos[0] + shift[0] - self.img.get_width() // 2,
-                    self.pos[1] + shift[1] - self.img.get_height(),
-                ),
-            )
+            surface.blit(*self.get_blit(shift, alpha))
         else:
-            pygame.draw.circle(surface, self.colour, offset(shift.copy(), self.pos), self.size)
+            pygame.draw.circle(surface, self.colour, offset(shift.copy(), self.lerp_pos(alpha)), self.size)
 
         # debug stuff for swarm targeting
         # if self.behaviour.priority_target:
@@ -1,5 +1,4 @@
 import math
-import random
 
 from .behaviour import Behaviour
 
@@ -8,7 +7,8 @@ PATH_UPDATE_FREQ = 0.4
 
 class Base(Behaviour):
     def complete_init(self):
-        self.current_path = None
+        self.current_path = None  # shared with other entities so mustn't be changed. Walk it with path_index.
+        self.path_index = 0
         self.movement_mode = "path"
         self.state = self.movement_mode
         self.target_unit = None
@@ -17,24 +17,24 @@ class Base(Behaviour):
         self.visibility_line = False
 
         # put entities on different path update cycles
-        self.last_path_update = PATH_UPDATE_FREQ * random.random()
+        self.last_path_update = PATH_UPDATE_FREQ * self.game.rng.gameplay.random()
 
     def walk_towards(self, point, amt):
         angle = math.atan2(point[1] - self.entity.pos[1], point[0] - self.entity.pos[0])
         self.entity.advance(angle, amt)
 
     def walk_path(self, dt):
-        next_point = self.current_path[0]
+        next_point = self.current_path[self.path_index]
         self.walk_towards(next_point, self.entity.move_speed * dt)
         if (
             math.sqrt((next_point[0] - self.entity.pos[0]) ** 2 + (next_point[1] - self.entity.pos[1]) ** 2)
             < self.game.combat.terrain.tile_size // 3
         ):
-            self.current_path.pop(0)
+            self.path_index += 1
 
     def update_target(self):
         if len(self.entity.unit.behaviour.valid_targets):
-            self.target_entity = random.choice(self.entity.unit.behaviour.valid_targets)
+            self.target_entity = self.game.rng.gameplay.choice(self.entity.unit.behaviour.valid_targets)
         else:
             self.target_entity = None
 
@@ -75,29 +75,31 @@ class Base(Behaviour):
                 self.visibility_line = False
 
             if not self.visibility_line:
-                if self.entity.unit.behaviour.smart_range_retarget:
-                    for entity in self.game.combat.all_entities:
-                        if entity.team != self.entity.team:
-                            if entity.dis(self.entity) < self.entity.range + self.entity.size + self.target_entity.size:
-                                if self.game.combat.terrain.sight_line(entity.pos.copy(), self.entity.pos.copy()):
-                                    self.target_entity = entity
-                                    self.target_pos = self.target_entity.pos.copy()
-                                    break
+                if self.entity.unit.behaviour.smart_range_retarget and self.target_entity:
+                    retarget_range = self.entity.range + self.entity.size + self.target_entity.size
+                    for entity in self.game.combat.target_index.enemies_within(
+                        self.entity.pos, retarget_range, self.entity.team
+                    ):
+                        if self.game.combat.terrain.sight_line(entity.pos.copy(), self.entity.pos.copy()):
+                            self.target_entity = entity
+                            self.target_pos = self.target_entity.pos.copy()
+                            break
 
             if self.state == "path":
                 if self.entity.unit.behaviour.regrouping:
                     self.target_pos = self.entity.unit.behaviour.leader.pos.copy()
                 if self.entity.unit.behaviour.retreating:
                     self.target_pos = list(self.entity.unit.behaviour.retreat_target)
-                if self.target_pos:
+                if self.target_pos is not None:
                     self.current_path = self.game.combat.terrain.pathfinder.px_route(
                         self.entity.pos.copy(), self.target_pos.copy()
                     )
+                    self.path_index = 0
 
         if self.state == "path":
-            if self.current_path and len(self.current_path):
+            if self.current_path and self.path_index < len(self.current_path):
                 self.walk_path(dt)
 
         if self.state == "straight":
-            if self.target_pos:
+            if self.target_pos is not None:
                 self.walk_towards(self.target_pos, self.entity.move_speed * dt)
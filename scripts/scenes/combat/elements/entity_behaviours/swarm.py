@@ -1,5 +1,4 @@
 import math
-import random
 
 from scripts.scenes.combat.elements.entity_behaviours.behaviour import Behaviour
 
@@ -8,7 +7,8 @@ class Swarm(Behaviour):
     def complete_init(self):
         self.priority_target = None
         self.loop_around = 0
-        self.loop_direction = random.choice([random.random() * 2 - 1, 0])  # don't use seeded rng
+        rng = self.game.rng.gameplay
+        self.loop_direction = rng.choice([rng.random() * 2 - 1, 0])
 
     def process(self, dt):
         # reduce loop around timer
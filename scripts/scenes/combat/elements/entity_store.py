@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from typing import Dict, List
+
+    from scripts.core.game import Game
+    from scripts.scenes.combat.elements.entity import Entity
+
+__all__ = ["EntityStore"]
+
+
+class EntityStore:
+    """
+    Struct-of-arrays copy of the entity state that passes over the whole battle need, so they can run on NumPy arrays
+    rather than one entity at a time. Changes made through the store, e.g. by move, are written back to the entities.
+
+    N.B. entities keep their own state, as reading single values from arrays is much slower than from attributes,
+    and behaviours do that a great deal. The arrays are gathered from the entities by sync.
+    """
+
+    def __init__(self, game: Game):
+        self.game: Game = game
+
+        self.entities: List[Entity] = []
+        self.team_ids: Dict[str, int] = {}
+
+        self.pos: np.ndarray = np.zeros((0, 2))
+        self.alive: np.ndarray = np.zeros(0, dtype=bool)
+        self.size: np.ndarray = np.zeros(0)
+        self.weight: np.ndarray = np.zeros(0)
+        self.team: np.ndarray = np.zeros(0, dtype=np.int64)  # index in to team_ids
+
+    def get_team_id(self, team: str) -> int:
+        return self.team_ids.setdefault(team, len(self.team_ids))
+
+    def sync(self, entities: List[Entity]):
+        """
+        Gather the positions and alive states of the entities. Stats that don't change during combat are only gathered
+        when given a different list of entities.
+        """
+        if entities is not self.entities:
+            self.entities = entities
+            self.size = np.array([entity.size for entity in entities], dtype=float)
+            self.weight = np.array([entity.weight for entity in entities], dtype=float)
+            self.team = np.array([self.get_team_id(entity.team) for entity in entities], dtype=np.int64)
+
+        self.pos = np.array([entity.pos for entity in entities], dtype=float).reshape(-1, 2)
+        self.alive = np.array([entity.alive for entity in entities], dtype=bool)
+
+    def move(self, indices: np.ndarray, movement: np.ndarray):
+        """
+        Move the entities at the indices by an (n, 2) array of movement, as Entity.move would move each of them, and
+        stopping at solid tiles in the same way.
+        """
+        terrain = self.game.combat.terrain
+        tile_size = terrain.tile_size
+        pos = self.pos[indices]
+
+        # split in to steps of less than a tile, so nothing can skip over a solid tile
+        move_count = (np.abs(movement) // tile_size + 1).max(axis=1)
+        step = movement / move_count[:, None]
+
+        for i in range(int(move_count.max(initial=0))):
+            moving = move_count > i
+            for axis in (0, 1):
+                pos[moving, axis] += step[moving, axis]
+
+                # back out to just before the edge of the tile moved in to
+                solid = moving & terrain.check_tiles_solid(pos)
+                tile_edge = np.floor_divide(pos[:, axis], tile_size) * tile_size
+                pos[:, axis] = np.where(solid & (step[:, axis] > 0), tile_edge - 1, pos[:, axis])
+                pos[:, axis] = np.where(solid & (step[:, axis] < 0), tile_edge + tile_size + 1, pos[:, axis])
+
+        self.pos[indices] = pos
+        for i, entity_pos in zip(indices.tolist(), pos.tolist()):
+            self.entities[i].pos[:] = entity_pos
@@ -1,5 +1,4 @@
 import math
-import random
 
 from . import traps
 from .tile import Tile
@@ -9,11 +8,12 @@ def gen_blob(start_pos, count, tile_type, terrain, floor_filter=None):
     blob_points = [tuple(start_pos)]
     directions = [(-1, 0), (1, 0), (0, 1), (0, -1)]
 
+    rng = terrain.game.rng.terrain
     for i in range(count):
         placed = False
         while not placed:
-            base = random.choice(blob_points)
-            direction = random.choice(directions)
+            base = rng.choice(blob_points)
+            direction = rng.choice(directions)
             new_pos = (base[0] + direction[0], base[1] + direction[1])
             if new_pos not in blob_points:
                 blob_points.append(new_pos)
@@ -32,14 +32,15 @@ def gen_blob(start_pos, count, tile_type, terrain, floor_filter=None):
             terrain.terrain[point].append(Tile(tile_type, point, terrain.game.data.tiles))
 
 
-def random_foliage():
+def random_foliage(rng):
     """
     Return ids for random tile decorations
     """
-    return [random.randint(0, 1), random.randint(2, 13)]
+    return [rng.randint(0, 1), rng.randint(2, 13)]
 
 
 def generate(game, terrain, biome):
+    rng = game.rng.terrain
     screen_size = game.window.base_resolution.copy()
     combat_area_size = [int(screen_size[0] // terrain.tile_size), int(screen_size[1] // terrain.tile_size)]
     placement_width = math.ceil(combat_area_size[0] / 4)
@@ -51,13 +52,13 @@ def generate(game, terrain, biome):
             if (terrain.barrier_size < x <= (combat_area_size[0] + terrain.barrier_size)) and (
                 terrain.barrier_size < y <= (combat_area_size[1] + terrain.barrier_size)
             ):
-                if random.random() < 0.3:
-                    terrain.terrain[loc].append(Tile([biome, *random_foliage()], loc, game.data.tiles))
-                if random.random() < 0.025:
+                if rng.random() < 0.3:
+                    terrain.terrain[loc].append(Tile([biome, *random_foliage(rng)], loc, game.data.tiles))
+                if rng.random() < 0.025:
                     tree_bases.append(loc)
                 # place traps
-                # elif random.random() < terrain.trap_density:
-                #     trap_type = random.choice(terrain.trap_types)
+                # elif rng.random() < terrain.trap_density:
+                #     trap_type = rng.choice(terrain.trap_types)
                 #     terrain.traps.append(
                 #         traps.trap_types[trap_type](game, (loc[0] * terrain.tile_size, loc[1] * terrain.tile_size))
                 #     )
@@ -69,7 +70,7 @@ def generate(game, terrain, biome):
     # for base in tree_bases:
     #     gen_blob(
     #         base,
-    #         random.randint(3, 24),
+    #         rng.randint(3, 24),
     #         ["trees", 0, 1],
     #         terrain,
     #         floor_filter=lambda x: (not x.config["solid"])
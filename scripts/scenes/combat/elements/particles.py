@@ -1,44 +1,91 @@
 import math
-import random
 
+import numpy as np
+import pygame
 
-class Particle:
-    def __init__(self, loc, vel, dur, colour):
-        self.loc = list(loc)
-        self.vel = list(vel)
-        self.dur = dur
-        self.colour = colour
+PARTICLE_CAPACITY = 16384  # max number of particles alive at once. Further particles are dropped.
 
-    def update(self, dt):
-        self.loc[0] += self.vel[0] * dt
-        self.loc[1] += self.vel[1] * dt
 
-        self.dur -= dt
-        if self.dur < 0:
-            return False
-        return True
+class ParticleManager:
+    """
+    Holds all particles in a fixed size pool of arrays so they can be updated and drawn in bulk. Live particles are
+    always the first count entries, in the order they were created.
 
-    def render(self, surf, offset=(0, 0)):
-        surf.set_at((int(self.loc[0] + offset[0]), int(self.loc[1] + offset[1])), self.colour)
+    Random values are drawn from rng, which should be a cosmetic stream so particles never change how combat plays out.
+    """
 
+    def __init__(self, rng, capacity=PARTICLE_CAPACITY):
+        self.rng = rng
 
-class ParticleManager:
-    def __init__(self):
-        self.particles = []
+        self.count = 0
+        self.loc = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.dur = np.zeros(capacity)
+        self.colour = np.zeros(capacity, dtype=np.int32)  # index in to colours
+
+        self.colours = []
+        self._colour_ids = {}
+
+    @property
+    def capacity(self):
+        return len(self.dur)
 
     def create_particle_burst(self, loc, colour, count, speed_range=[30, 60], dur_range=[0.2, 0.3]):
+        colour = tuple(colour)
+        if colour not in self._colour_ids:
+            self._colour_ids[colour] = len(self.colours)
+            self.colours.append(colour)
+
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+
+        rng = self.rng
+        burst = []
         for i in range(count):
-            speed = random.random() * (speed_range[1] - speed_range[0]) + speed_range[0]
-            dur = random.random() * (dur_range[1] - dur_range[0]) + dur_range[0]
-            angle = random.random() * math.pi * 2
-            p = Particle(loc, [math.cos(angle) * speed, math.sin(angle) * speed], dur, colour)
-            self.particles.append(p)
+            speed = rng.random() * (speed_range[1] - speed_range[0]) + speed_range[0]
+            dur = rng.random() * (dur_range[1] - dur_range[0]) + dur_range[0]
+            angle = rng.random() * math.pi * 2
+            burst.append((math.cos(angle) * speed, math.sin(angle) * speed, dur))
+
+        start = self.count
+        end = start + len(burst)
+        values = np.array(burst)
+        self.loc[start:end] = loc[:2]
+        self.vel[start:end] = values[:, :2]
+        self.dur[start:end] = values[:, 2]
+        self.colour[start:end] = self._colour_ids[colour]
+        self.count = end
 
     def update(self, dt):
-        for i, p in sorted(enumerate(self.particles), reverse=True):
-            if not p.update(dt):
-                self.particles.pop(i)
+        n = self.count
+        self.loc[:n] += self.vel[:n] * dt
+        self.dur[:n] -= dt
+
+        # compact the survivors to the front, keeping their order
+        alive = np.flatnonzero(self.dur[:n] >= 0)
+        if len(alive) != n:
+            count = len(alive)
+            self.loc[:count] = self.loc[alive]
+            self.vel[:count] = self.vel[alive]
+            self.dur[:count] = self.dur[alive]
+            self.colour[:count] = self.colour[alive]
+            self.count = count
 
     def render(self, surf, offset=(0, 0)):
-        for p in self.particles:
-            p.render(surf, offset=offset)
+        n = self.count
+        if not n:
+            return
+
+        # N.B. int truncates towards 0, as set_at did
+        x = (self.loc[:n, 0] + offset[0]).astype(np.int64)
+        y = (self.loc[:n, 1] + offset[1]).astype(np.int64)
+        on_surf = (x >= 0) & (x < surf.get_width()) & (y >= 0) & (y < surf.get_height())
+
+        # where particles overlap, the last written, i.e. the newest, is shown
+        mapped_colours = np.array([surf.map_rgb(colour) for colour in self.colours], dtype=np.int64)
+        pixels = pygame.surfarray.pixels2d(surf)
+        pixels[x[on_surf], y[on_surf]] = mapped_colours[self.colour[:n][on_surf]]
+
+        # release the lock on the surface
+        del pixels
@@ -1,15 +1,164 @@
+from collections import OrderedDict
+
+import numpy as np
 import tcod
 
+FLOW_FIELD_CACHE_SIZE = 64  # max number of target tiles to hold a flow field for
+PATH_CACHE_SIZE = 1024  # max number of routes to hold
+UNREACHABLE = np.iinfo(np.int32).max
+
+
+class PathCache:
+    """
+    A least recently used cache of routes, keyed on their start and end tiles. Entries are stamped with the terrain
+    version they were found on and are ignored once the terrain changes.
+    """
+
+    def __init__(self, size=PATH_CACHE_SIZE):
+        self.size = size
+        self.routes = OrderedDict()
+
+    def get(self, key, version):
+        entry = self.routes.get(key)
+        if (entry is None) or (entry[0] != version):
+            return None
+
+        self.routes.move_to_end(key)
+        return entry[1]
+
+    def set(self, key, version, route):
+        self.routes[key] = (version, route)
+        self.routes.move_to_end(key)
+        if len(self.routes) > self.size:
+            self.routes.popitem(last=False)
+
 
 class Pathfinder:
     def __init__(self, terrain):
         self.tcod_map = None
         self.terrain = terrain
 
+        # when True, paths follow a distance field shared by everything heading to the same tile, rather than each
+        # route running its own A*
+        self.use_flow_fields = True
+        self.cost = None
+        self.flow_fields = {}
+        self.tile_locs = []  # the loc of each tile index in a flow field
+        self.tile_centres = []  # the pixel position of the centre of each tile index in a flow field
+        self._tile_indices = None
+
+        # routes are shared so are held as tuples. Don't try to modify them.
+        self.route_cache = PathCache()
+        self.px_route_cache = PathCache()
+
     def set_map(self, map_data):
-        self.tcod_map = tcod.path.AStar(map_data, diagonal=0)
+        # N.B. tcod only accepts 8, 16 and 32 bit cost arrays
+        self.cost = np.array(map_data, dtype=np.int8)
+        self.tcod_map = tcod.path.AStar(self.cost, diagonal=0)
+        self.flow_fields = {}
+
+        height, width = self.cost.shape
+        self._tile_indices = np.arange(height * width).reshape(height, width)
+        self.tile_locs = [
+            (x + self.terrain.tile_boundaries[0][0], y + self.terrain.tile_boundaries[1][0])
+            for y in range(height)
+            for x in range(width)
+        ]
+        self.tile_centres = [self.loc_to_px(loc) for loc in self.tile_locs]
+
+    def get_flow_field(self, end):
+        """
+        Get the flow field for an end tile, as a flat list holding, for each tile, the index of the next tile on the
+        way to the end, or -1 where there is no way to get closer. Fields are cached per end tile until the map changes.
+
+        N.B. a tile's index is y * width + x.
+        """
+        if end not in self.flow_fields:
+            if len(self.flow_fields) >= FLOW_FIELD_CACHE_SIZE:
+                del self.flow_fields[next(iter(self.flow_fields))]
+
+            self.flow_fields[end] = self._build_flow_field(end)
+
+        return self.flow_fields[end]
+
+    def _build_flow_field(self, end):
+        height, width = self.cost.shape
+
+        distance = np.full(self.cost.shape, UNREACHABLE, dtype=np.int32)
+        distance[end[1], end[0]] = 0
+        tcod.path.dijkstra2d(distance, self.cost, 1, None, out=distance)
+
+        # where several neighbours are equally close by path, prefer the one closest to the end in a straight line, so
+        # paths stay close to a straight line rather than doing one axis and then the other. The squared straight line
+        # distance is folded in below the path distance so a single comparison handles both.
+        scale = width ** 2 + height ** 2 + 1
+        ys, xs = np.ogrid[-1 : height + 1, -1 : width + 1]
+        scores = np.full((height + 2, width + 2), UNREACHABLE, dtype=np.int64)
+        scores[1:-1, 1:-1] = distance
+        scores *= scale
+        scores += (xs - end[0]) ** 2 + (ys - end[1]) ** 2
+
+        right = scores[1:-1, 2:]
+        left = scores[1:-1, :-2]
+        down = scores[2:, 1:-1]
+        up = scores[:-2, 1:-1]
+        best_score = np.minimum(np.minimum(right, left), np.minimum(down, up))
+
+        # ties go to the first direction, in the order right, left, down, up
+        is_right = right == best_score
+        is_left = left == best_score
+        is_down = down == best_score
+        step = np.select([is_right, is_left, is_down], [1, -1, width], -width)
+
+        # N.B. a solid tile is never given a distance but can still step down to an open neighbour
+        closer = best_score < distance.astype(np.int64) * scale
+        next_tile = np.where(closer, self._tile_indices + step, -1)
+
+        # walking the field is done a tile at a time, which is much quicker on lists than arrays
+        return next_tile.ravel().tolist()
+
+    def in_bounds(self, point):
+        return (0 <= point[0] < self.cost.shape[1]) and (0 <= point[1] < self.cost.shape[0])
+
+    def loc_to_px(self, loc):
+        return (
+            loc[0] * self.terrain.tile_size + self.terrain.tile_size // 2,
+            loc[1] * self.terrain.tile_size + self.terrain.tile_size // 2,
+        )
+
+    def flow_route(self, start, end, points=None):
+        """
+        Route by following the end tile's flow field. Gives a path of the same length as A*, though where there are
+        several shortest paths it may pick a different one.
+
+        points is what to return for each tile on the path, by tile index. Defaults to tile_locs.
+        """
+        if (self.cost is None) or not (self.in_bounds(start) and self.in_bounds(end)):
+            return []
+
+        # match A*, which won't route to a solid tile
+        if not self.cost[end[1], end[0]]:
+            return []
+
+        if points is None:
+            points = self.tile_locs
+        next_tile = self.get_flow_field(end)
+
+        path = []
+        index = next_tile[start[1] * self.cost.shape[1] + start[0]]
+        while index != -1:
+            path.append(points[index])
+            index = next_tile[index]
+
+        return path
+
+    def _find_route(self, start, end):
+        """
+        Find the tiles to walk from start to end, not including start, without using the cache.
+        """
+        if self.use_flow_fields:
+            return self.flow_route(start, end)
 
-    def route(self, start, end):
         if self.tcod_map:
             tcod_path = self.tcod_map.get_path(start[1], start[0], end[1], end[0])
             return [
@@ -19,7 +168,23 @@ class Pathfinder:
 
         return []
 
+    def route(self, start, end):
+        """
+        Get the tiles to walk from start to end, not including start. Returns a tuple, which may be shared.
+        """
+        key = (tuple(start), tuple(end))
+        path = self.route_cache.get(key, self.terrain.version)
+        if path is None:
+            path = tuple(self._find_route(start, end))
+            self.route_cache.set(key, self.terrain.version, path)
+
+        return path
+
     def px_route(self, start, end):
+        """
+        Get the pixel positions, at the centre of each tile, to walk from start to end. Returns a tuple, which may be
+        shared.
+        """
         start = (
             int(start[0] // self.terrain.tile_size) - self.terrain.tile_boundaries[0][0],
             int(start[1] // self.terrain.tile_size) - self.terrain.tile_boundaries[1][0],
@@ -28,11 +193,14 @@ class Pathfinder:
             int(end[0] // self.terrain.tile_size) - self.terrain.tile_boundaries[0][0],
             int(end[1] // self.terrain.tile_size) - self.terrain.tile_boundaries[1][0],
         )
-        tcod_path = self.route(start, end)
-        return [
-            (
-                point[0] * self.terrain.tile_size + self.terrain.tile_size // 2,
-                point[1] * self.terrain.tile_size + self.terrain.tile_size // 2,
-            )
-            for point in tcod_path
-        ]
+
+        key = (start, end)
+        path = self.px_route_cache.get(key, self.terrain.version)
+        if path is None:
+            if self.use_flow_fields:
+                path = tuple(self.flow_route(start, end, self.tile_centres))
+            else:
+                path = tuple(self.loc_to_px(loc) for loc in self._find_route(start, end))
+            self.px_route_cache.set(key, self.terrain.version, path)
+
+        return path
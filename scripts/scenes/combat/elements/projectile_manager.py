@@ -1,4 +1,12 @@
+import math
+
+import numpy as np
+
 from scripts.scenes.combat.elements.projectile import Projectile
+from scripts.scenes.combat.elements.spatial_hash import SpatialHash
+
+PROJECTILE_STEP = 4  # max distance a projectile moves between collision checks
+PROJECTILE_HIT_SIZE = 8  # width and height of the box, centred on the projectile, that an entity's position must be in
 
 
 class ProjectileManager:
@@ -6,15 +14,127 @@ class ProjectileManager:
         self.game = game
         self.projectiles = []
 
+        # entities, by their position at the time projectiles are moved
+        self.spatial_hash = SpatialHash()
+
     def add_projectile(self, owner, target):
         self.projectiles.append(Projectile(self.game, owner, target))
 
     def update(self, dt):
-        for i, projectile in sorted(enumerate(self.projectiles), reverse=True):
-            alive = projectile.update(dt)
-            if not alive:
-                self.projectiles.pop(i)
+        """
+        Move all projectiles at once, checking each step of their movement against the terrain and against nearby
+        enemies, and deal damage for any hits.
+
+        N.B. hits are resolved in the same order, and against the same positions, as moving each projectile in turn
+        would, so damage and the random rolls it makes happen in the same order.
+        """
+        if not self.projectiles:
+            return
+
+        combat = self.game.combat
+        projectiles = self.projectiles
+        count = len(projectiles)
+
+        # step every projectile along its path, PROJECTILE_STEP at a time, keeping the same sums as stepping each alone
+        start = np.array([projectile.pos[:2] for projectile in projectiles], dtype=float)
+        direction = np.array([projectile.direction for projectile in projectiles], dtype=float)
+        remaining = np.array([projectile.speed for projectile in projectiles], dtype=float) * dt
+        pos = start
+        step_pos = []
+        step_moving = []
+        while True:
+            moving = remaining > 0
+            if not moving.any():
+                break
+
+            dis = np.where(moving, np.minimum(remaining, PROJECTILE_STEP), 0)
+            remaining = remaining - dis
+            pos = pos + direction * dis[:, None]
+            step_pos.append(pos)
+            step_moving.append(moving)
+
+        if not step_pos:
+            return
+
+        # [step, projectile]
+        step_pos = np.stack(step_pos)
+        step_moving = np.stack(step_moving)
+        steps = len(step_pos)
+
+        # first step each projectile hits terrain, or steps if it doesn't
+        hoverable = combat.terrain.check_tiles_hoverable(step_pos.reshape(-1, 2)).reshape(steps, count)
+        blocked = step_moving & ~hoverable
+        blocked_step = np.where(blocked.any(axis=0), blocked.argmax(axis=0), steps)
+
+        hit_entity = self._find_hits(step_pos, step_moving, blocked_step, start, dt)
+
+        # resolve in reverse order, as projectiles always have been
+        alive = [True] * count
+        final_pos = pos.tolist()
+        entities = combat.all_entities
+        for i in reversed(range(count)):
+            projectile = projectiles[i]
+            if hit_entity[i] != -1:
+                entities[hit_entity[i]].deal_damage(projectile.damage, projectile.owner)
+                alive[i] = False
+            elif blocked_step[i] != steps:
+                alive[i] = False
+            else:
+                projectile.prev_pos = projectile.pos
+                projectile.pos = final_pos[i]
+
+        # projectiles fired while resolving hits are kept
+        self.projectiles = [projectile for i, projectile in enumerate(projectiles) if alive[i]] + projectiles[count:]
+
+    def _find_hits(self, step_pos, step_moving, blocked_step, start, dt):
+        """
+        Find the first enemy each projectile hits before it is blocked by terrain. Returns a list holding, for each
+        projectile, the index in all_entities of the entity hit, or -1.
+
+        N.B. matches pygame.Rect.collidepoint, which truncates both the box and the point towards 0.
+        """
+        combat = self.game.combat
+        entities = combat.all_entities
+        projectiles = self.projectiles
+        count = len(start)
+        hit_entity = [-1] * count
+        if not entities:
+            return hit_entity
+
+        # make cells large enough that anything a projectile could hit this frame is in a cell next to its start
+        max_move = max(projectile.speed for projectile in projectiles) * dt
+        cell_size = max(combat.terrain.tile_size * 2, math.ceil(max_move) + PROJECTILE_HIT_SIZE)
+        store = combat.entity_store
+        store.sync(entities)
+        self.spatial_hash.rebuild(entities, store.pos, cell_size)
+
+        pair_projectile, pair_entity = self.spatial_hash.pairs_near(start)
+        owner_teams = np.array([store.get_team_id(projectile.owner.team) for projectile in projectiles])
+        enemy = store.team[pair_entity] != owner_teams[pair_projectile]
+        pair_projectile = pair_projectile[enemy]
+        pair_entity = pair_entity[enemy]
+        if not len(pair_projectile):
+            return hit_entity
+
+        # [step, pair]
+        point = np.trunc(self.spatial_hash.positions[pair_entity])
+        box = np.trunc(step_pos[:, pair_projectile] - PROJECTILE_HIT_SIZE / 2)
+        inside = (box <= point) & (point < box + PROJECTILE_HIT_SIZE)
+        hit = step_moving[:, pair_projectile] & inside[:, :, 0] & inside[:, :, 1]
+
+        hit_step = np.where(hit.any(axis=0), hit.argmax(axis=0), len(step_pos))
+        hit = hit_step < blocked_step[pair_projectile]
+        pair_projectile = pair_projectile[hit]
+        pair_entity = pair_entity[hit]
+        hit_step = hit_step[hit]
+
+        # each projectile hits at its earliest step, and within a step the first entity in all_entities
+        order = np.lexsort((pair_entity, hit_step, pair_projectile))
+        for i, entity in zip(pair_projectile[order][::-1].tolist(), pair_entity[order][::-1].tolist()):
+            hit_entity[i] = entity
+
+        return hit_entity
 
-    def render(self, surf, offset=(0, 0)):
+    def render(self, surf, offset=(0, 0), alpha=1):
         for projectile in self.projectiles:
-            projectile.render(surf, offset)
+            projectile.render(surf, offset, alpha)
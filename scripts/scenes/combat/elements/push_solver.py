@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from scripts.core.constants import PUSH_FORCE, WEIGHT_SCALE
+from scripts.scenes.combat.elements.spatial_hash import SpatialHash
+
+if TYPE_CHECKING:
+    from scripts.core.game import Game
+
+__all__ = ["PushSolver"]
+
+
+class PushSolver:
+    """
+    Separates overlapping entities. All overlapping pairs are found in one pass and their pushes summed, so each
+    entity is moved, and checked against the terrain, once per tick regardless of how many entities it overlaps.
+    """
+
+    def __init__(self, game: Game):
+        self.game: Game = game
+
+        self.spatial_hash: SpatialHash = SpatialHash()
+
+    def solve(self, dt: float):
+        combat = self.game.combat
+        store = combat.entity_store
+        store.sync(combat.all_entities)
+        indices = np.flatnonzero(store.alive)
+        if len(indices) < 2:
+            return
+
+        entities = [store.entities[i] for i in indices.tolist()]
+        positions = store.pos[indices]
+        sizes = store.size[indices]
+        weights = store.weight[indices] + WEIGHT_SCALE
+
+        # cells must be at least as large as the biggest combined size so all overlaps are in neighbouring cells
+        cell_size = max(combat.terrain.tile_size, int(sizes.max()) * 2)
+        self.spatial_hash.rebuild(entities, positions, cell_size)
+        first, second = self.spatial_hash.neighbour_pairs()
+
+        # keep only the pairs that actually overlap
+        offset = positions[second] - positions[first]
+        dis = np.sqrt(offset[:, 0] ** 2 + offset[:, 1] ** 2)
+        combined_size = sizes[first] + sizes[second]
+        overlapping = dis < combined_size
+        if not overlapping.any():
+            return
+
+        first = first[overlapping]
+        second = second[overlapping]
+        offset = offset[overlapping]
+        dis = dis[overlapping]
+        combined_size = combined_size[overlapping]
+
+        # each ordered pair pushes both entities apart, so, as both orderings are present, pushing gets doubled
+        angle = np.arctan2(offset[:, 1], offset[:, 0])
+        direction = np.stack((np.cos(angle), np.sin(angle)), axis=1)
+        force = (1 - dis / combined_size) * dt * PUSH_FORCE
+        first_weights = weights[first]
+        second_weights = weights[second]
+
+        displacement = np.zeros((len(entities), 2))
+        np.add.at(displacement, second, direction * (first_weights / second_weights * force)[:, None])
+        np.add.at(displacement, first, -direction * (second_weights / first_weights * force)[:, None])
+
+        # apply the summed push, including the terrain check, once per entity
+        pushed = np.flatnonzero(displacement.any(axis=1))
+        store.move(indices[pushed], displacement[pushed])
+
+        for i, j in zip(first.tolist(), second.tolist()):
+            entity = entities[i]
+            pushed_entity = entities[j]
+            pushed_entity.pushed_by_log = (pushed_entity.pushed_by_log + [entity])[-30:]
+            entity.pushed_log = (entity.pushed_log + [pushed_entity])[-30:]
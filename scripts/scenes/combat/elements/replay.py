@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import bisect
+import copy
+import datetime
+import logging
+import os
+import pickle
+import struct
+from typing import TYPE_CHECKING
+
+from scripts.core.constants import COMBAT_STEP, MAX_SAVED_REPLAYS, REPLAY_KEYFRAME_INTERVAL, REPLAY_PATH
+from scripts.scenes.combat.elements.snapshot import CombatSnapshot, GameUnpickler
+from scripts.scenes.combat.elements.unit import Unit
+
+if TYPE_CHECKING:
+    from typing import List, Optional, Tuple
+
+    from scripts.core.game import Game
+
+__all__ = ["CombatReplay", "ReplayRecorder", "ReplayPlayer"]
+
+
+REPLAY_MAGIC = b"NQPR"
+REPLAY_VERSION = 1
+KEYFRAME_TICKS = round(REPLAY_KEYFRAME_INTERVAL / COMBAT_STEP)  # ticks between keyframes
+
+
+class CombatReplay:
+    """
+    Everything needed to play a combat again: the seed and biome it was generated from, every input given to it, as
+    (tick, kind, data), and a keyframe of the full state every REPLAY_KEYFRAME_INTERVAL, to seek with.
+
+    Inputs are applied before the tick they are recorded against.
+
+    N.B. replays are pickled. Loading is limited to the game's own classes, but that still runs their code, so only
+    load replays from a trusted source.
+    """
+
+    def __init__(self, seed: int, biome: str):
+        self.seed: int = seed
+        self.biome: str = biome
+
+        self.events: List[Tuple[int, str, Tuple]] = []
+        self.keyframes: List[CombatSnapshot] = []  # in tick order
+        self.length: int = 0  # number of ticks recorded
+
+    @property
+    def duration(self) -> float:
+        """
+        Length of the combat, in seconds.
+        """
+        return self.length * COMBAT_STEP
+
+    def get_keyframe(self, tick: int) -> Optional[CombatSnapshot]:
+        """
+        Get the latest keyframe at or before the tick. None if there isn't one.
+        """
+        index = bisect.bisect_right([keyframe.tick for keyframe in self.keyframes], tick)
+        if index == 0:
+            return None
+
+        return self.keyframes[index - 1]
+
+    def save(self, path: str):
+        """
+        Write the replay to a binary file.
+        """
+        data = {
+            "seed": self.seed,
+            "biome": self.biome,
+            "length": self.length,
+            "events": self.events,
+            "keyframes": self.keyframes,
+        }
+        with open(path, "wb") as file:
+            file.write(REPLAY_MAGIC)
+            file.write(struct.pack("<H", REPLAY_VERSION))
+            pickle.dump(data, file, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> CombatReplay:
+        """
+        Read a replay written by save. Raises a ValueError if the file isn't a replay of this version or holds anything
+        other than the game's own objects.
+
+        N.B. only load replays from a trusted source. See CombatReplay.
+        """
+        with open(path, "rb") as file:
+            if file.read(len(REPLAY_MAGIC)) != REPLAY_MAGIC:
+                raise ValueError(f"{path} is not a replay.")
+
+            (version,) = struct.unpack("<H", file.read(2))
+            if version != REPLAY_VERSION:
+                raise ValueError(f"{path} is replay version {version}, expected {REPLAY_VERSION}.")
+
+            try:
+                data = GameUnpickler(file).load()
+            except pickle.UnpicklingError as exception:
+                raise ValueError(f"{path} couldn't be read. {exception}")
+
+        replay = cls(data["seed"], data["biome"])
+        replay.length = data["length"]
+        replay.events = data["events"]
+        replay.keyframes = data["keyframes"]
+
+        return replay
+
+
+class ReplayRecorder:
+    """
+    Records the combat in the CombatScene as it is played. Inputs are recorded as they happen and everything else is
+    checked once per tick, so recording costs next to nothing outside of keyframes.
+    """
+
+    def __init__(self, game: Game):
+        self.game: Game = game
+
+        self.replay: Optional[CombatReplay] = None
+        self._force_idle: Optional[bool] = None
+
+    @property
+    def is_recording(self) -> bool:
+        return self.replay is not None
+
+    def start(self, seed: int, biome: str):
+        """
+        Start recording a new combat, dropping any recording in progress.
+        """
+        self.replay = CombatReplay(seed, biome)
+        self._force_idle = None
+
+    def stop(self) -> Optional[CombatReplay]:
+        """
+        Stop recording and return what was recorded.
+        """
+        replay = self.replay
+        self.replay = None
+
+        return replay
+
+    def save(self) -> Optional[str]:
+        """
+        Stop recording and write the replay to the replay folder, keeping only the newest MAX_SAVED_REPLAYS. Returns
+        the path written to. Nothing is written if saving replays is turned off in the Debugger.
+        """
+        replay = self.stop()
+        if (replay is None) or (not self.game.debug.is_saving_replays):
+            return None
+
+        date_and_time = datetime.datetime.utcnow()
+        path = str(REPLAY_PATH) + "/" + date_and_time.strftime("%Y%m%d@%H%M%S") + f"_{replay.seed}.replay"
+        try:
+            replay.save(path)
+        except OSError as exception:
+            logging.warning(f"ReplayRecorder: couldn't save replay to {path}. {exception}")
+            return None
+
+        logging.debug(f"Saved {format(replay.duration, '.1f')}s replay to {path}.")
+
+        self._remove_old_replays()
+
+        return path
+
+    @staticmethod
+    def _remove_old_replays():
+        """
+        Delete all but the newest MAX_SAVED_REPLAYS from the replay folder.
+        """
+        try:
+            # N.B. names start with the date and time, so sort oldest first
+            replays = sorted(file for file in os.listdir(REPLAY_PATH) if file.endswith(".replay"))
+            for file in replays[:-MAX_SAVED_REPLAYS]:
+                os.remove(REPLAY_PATH / file)
+
+        except OSError as exception:
+            logging.warning(f"ReplayRecorder: couldn't remove old replays. {exception}")
+
+    def record_unit(self, unit: Unit):
+        """
+        Record a unit about to be added to the combat.
+        """
+        if self.replay is None:
+            return
+
+        data = (unit.id, unit.type, unit.team, copy.deepcopy(unit.modifiers), unit.injuries, list(unit.pos))
+        self.replay.events.append((self.game.combat.tick, "unit", data))
+
+    def record_action(self, action_type: str, pos: List[float]):
+        """
+        Record an action about to be used.
+        """
+        if self.replay is None:
+            return
+
+        self.replay.events.append((self.game.combat.tick, "action", (action_type, list(pos))))
+
+    def record_tick(self):
+        """
+        Record anything that changed since the last tick. Called at the start of each tick.
+        """
+        if self.replay is None:
+            return
+
+        combat = self.game.combat
+        tick = combat.tick
+
+        if combat.force_idle != self._force_idle:
+            self._force_idle = combat.force_idle
+            self.replay.events.append((tick, "idle", (combat.force_idle,)))
+
+        if tick % KEYFRAME_TICKS == 0:
+            self.replay.keyframes.append(CombatSnapshot.capture(combat))
+
+        self.replay.length = tick + 1
+
+
+class ReplayPlayer:
+    """
+    Plays a replay in the CombatScene, in place of the current combat. The scene steps the combat as usual, so the
+    replay plays at whatever speed combat is watched at.
+    """
+
+    def __init__(self, game: Game, replay: CombatReplay):
+        self.game: Game = game
+        self.replay: CombatReplay = replay
+
+        self._next_event: int = 0  # index of the first event not yet applied
+
+    @property
+    def time(self) -> float:
+        """
+        How far through the replay the combat is, in seconds.
+        """
+        return self.game.combat.tick * COMBAT_STEP
+
+    @property
+    def is_finished(self) -> bool:
+        return self.game.combat.tick >= self.replay.length
+
+    def apply_events(self):
+        """
+        Apply the inputs recorded against the current tick. Called at the start of each tick.
+        """
+        combat = self.game.combat
+        events = self.replay.events
+
+        while self._next_event < len(events) and events[self._next_event][0] <= combat.tick:
+            _, kind, data = events[self._next_event]
+            self._next_event += 1
+
+            if kind == "unit":
+                id_, unit_type, team, modifiers, injuries, pos = data
+                unit = Unit(self.game, id_, unit_type, team)
+                unit.modifiers = copy.deepcopy(modifiers)
+                unit.injuries = injuries
+                unit.pos = list(pos)
+                combat.units.add_unit_to_combat(unit)
+
+            elif kind == "action":
+                action_type, pos = data
+                combat.actions[action_type](self.game).use(list(pos))
+
+            elif kind == "idle":
+                combat.force_idle = data[0]
+
+    def seek(self, tick: int):
+        """
+        Move the combat to the start of the given tick, by restoring the nearest keyframe before it and playing on
+        from there.
+        """
+        combat = self.game.combat
+        tick = max(0, min(tick, self.replay.length))
+
+        keyframe = self.replay.get_keyframe(tick)
+        if keyframe is None:
+            combat.prepare_simulation(self.replay.seed, self.replay.biome)
+            self._next_event = 0
+        else:
+            keyframe.restore(combat)
+
+            # events recorded against the keyframe's tick are already part of it
+            ticks = [event_tick for event_tick, _, _ in self.replay.events]
+            self._next_event = bisect.bisect_right(ticks, keyframe.tick)
+
+        while combat.tick < tick:
+            combat.step(COMBAT_STEP)
+
+        combat.particles.count = 0
+        combat.step_accumulator = 0
+        combat.render_alpha = 1
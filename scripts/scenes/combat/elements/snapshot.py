@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import copyreg
+import io
+import pickle
+import zlib
+from typing import TYPE_CHECKING
+
+from scripts.scenes.combat.elements.unit import Unit
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Tuple, Union
+
+    from scripts.core.game import Game
+    from scripts.scenes.combat.headless import HeadlessCombat
+    from scripts.scenes.combat.scene import CombatScene
+
+__all__ = ["CombatSnapshot", "GameUnpickler"]
+
+
+def _get_game():
+    """
+    Stands in for the game in pickled combat state. _SnapshotUnpickler swaps it for the game being restored in to.
+    """
+    raise pickle.UnpicklingError("Combat state must be unpickled with a _SnapshotUnpickler.")
+
+
+def _get_unit(index: int):
+    """
+    Stands in for a unit in pickled combat state. _SnapshotUnpickler swaps it for the unit being restored in to.
+    """
+    raise pickle.UnpicklingError("Combat state must be unpickled with a _SnapshotUnpickler.")
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """
+    Pickles combat state, leaving out the game, as that isn't part of the combat, and the units, which are pickled
+    separately so they can be restored in to the same objects.
+
+    N.B. these are swapped out through the dispatch table, rather than persistent_id, so that only they, and not every
+    object pickled, call back in to Python.
+    """
+
+    def __init__(self, file, game: Game, units: List[Unit]):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+
+        unit_indices = {id(unit): i for i, unit in enumerate(units)}
+
+        self.dispatch_table = copyreg.dispatch_table.copy()
+        self.dispatch_table[type(game)] = lambda obj: (_get_game, ())
+        self.dispatch_table[Unit] = lambda unit: (_get_unit, (unit_indices[id(unit)],))
+
+
+class GameUnpickler(pickle.Unpickler):
+    """
+    Unpickles data that should only hold the game's own objects. Loading any other global, e.g. a function that could
+    be called while unpickling, raises an UnpicklingError.
+
+    N.B. this narrows what a malicious file could do but doesn't make loading one safe, as the game's own classes are
+    still created, so only load files from a trusted source.
+    """
+
+    def find_class(self, module, name):
+        if module.startswith("scripts.") and "." not in name:
+            obj = super().find_class(module, name)
+            if isinstance(obj, type):
+                return obj
+
+        raise pickle.UnpicklingError(f"{module}.{name} isn't allowed to be loaded.")
+
+
+class _SnapshotUnpickler(GameUnpickler):
+    """
+    Unpickles combat state, pointing it at the given game and units.
+    """
+
+    def __init__(self, file, game: Game, units: List[Unit]):
+        super().__init__(file)
+        self.game: Game = game
+        self.units: List[Unit] = units
+
+    def find_class(self, module, name):
+        if module == __name__:
+            if name == "_get_game":
+                return lambda: self.game
+            if name == "_get_unit":
+                return lambda index: self.units[index]
+
+        return super().find_class(module, name)
+
+
+class CombatSnapshot:
+    """
+    The full state of a combat at the start of a tick: units, entities, projectiles, traps and the random streams that
+    decide what happens next. Held compressed, and picklable, so it can be kept in memory, saved or sent to another
+    process and restored there, e.g. to roll back, to seek in a replay or to play a fight on in a HeadlessCombat.
+
+    The map isn't held, as it never changes, so it is generated again from the seed and biome if restoring in to a
+    combat on a different map.
+    """
+
+    def __init__(self, tick: int, seed: int, biome: str, unit_keys: List[Tuple[int, str, str]], data: bytes):
+        self.tick: int = tick
+        self.seed: int = seed
+        self.biome: str = biome
+        self.unit_keys: List[Tuple[int, str, str]] = unit_keys  # (id, team, type) of each unit, in order
+        self.data: bytes = data
+
+    @property
+    def size(self) -> int:
+        """
+        Size, in bytes, of the compressed state.
+        """
+        return len(self.data)
+
+    @classmethod
+    def capture(cls, combat: Union[CombatScene, HeadlessCombat]) -> CombatSnapshot:
+        """
+        Take a snapshot of the combat. Intended to be called between ticks.
+        """
+        game = combat.game
+        units = combat.units.units
+        state: Dict[str, Any] = {
+            "force_idle": combat.force_idle,
+            "units": [unit.__getstate__() for unit in units],
+            "projectiles": combat.projectiles.projectiles,
+            "traps": combat.terrain.traps,
+            "last_unit_death": combat.last_unit_death,
+            "rng": (game.rng.gameplay.getstate(), game.rng.cosmetic.getstate()),
+        }
+
+        file = io.BytesIO()
+        _SnapshotPickler(file, game, units).dump(state)
+
+        # favour speed over size, as snapshots are taken mid combat
+        data = zlib.compress(file.getvalue(), 1)
+
+        unit_keys = [(unit.id, unit.team, unit.type) for unit in units]
+
+        return cls(combat.tick, combat.seed, combat.biome, unit_keys, data)
+
+    def restore(self, combat: Union[CombatScene, HeadlessCombat]):
+        """
+        Put the combat back in to the state the snapshot was taken in. Units already in the combat are restored in
+        place, so anything else holding them, such as a Troupe, still sees the same objects. Units added since the
+        snapshot are taken out of the combat.
+        """
+        # N.B. a combat that has never been prepared has no map, even if its seed and biome match
+        if (combat.seed, combat.biome) != (self.seed, self.biome) or not combat.terrain.terrain:
+            combat.prepare_simulation(self.seed, self.biome)
+
+        # reuse the units already in the combat, and create blank ones for any that aren't
+        existing = {(unit.id, unit.team, unit.type): unit for unit in combat.units.units}
+        units = [existing.get(key) or Unit.__new__(Unit) for key in self.unit_keys]
+
+        game = combat.game
+        state = _SnapshotUnpickler(io.BytesIO(zlib.decompress(self.data)), game, units).load()
+
+        for unit, unit_state in zip(units, state["units"]):
+            unit.__dict__.clear()
+            unit.__dict__.update(unit_state)
+
+        combat.tick = self.tick
+        combat.force_idle = state["force_idle"]
+        combat.units.units = units
+        combat.units.living_layer = []
+        combat.units.dead_layer = []
+        combat.projectiles.projectiles = state["projectiles"]
+        combat.terrain.traps = state["traps"]
+        combat.last_unit_death = state["last_unit_death"]
+        game.rng.gameplay.setstate(state["rng"][0])
+        game.rng.cosmetic.setstate(state["rng"][1])
+
+        combat.all_entities = combat.get_all_entities()
+
+        # borders aren't kept, so draw them again
+        if not combat.is_headless:
+            for unit in units:
+                if unit.team == "player":
+                    unit.gen_border_surface()
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from typing import List, Tuple
+
+    from scripts.scenes.combat.elements.entity import Entity
+
+__all__ = ["SpatialHash"]
+
+
+_CELL_OFFSET = 2 ** 20  # added to cell coords so negative cells still produce unique keys
+_CELL_STRIDE = 2 ** 21
+
+
+class SpatialHash:
+    """
+    A uniform grid of entities, bucketed by position. Used as a broadphase so that only entities in neighbouring cells
+    need to be compared, and to find entities near a position.
+
+    Cells are held as sorted arrays of keys rather than lists so neighbour lookups can be done in bulk.
+    """
+
+    def __init__(self, cell_size: int = 16):
+        self.cell_size: int = cell_size
+
+        self.entities: List[Entity] = []
+        self.positions: np.ndarray = np.zeros((0, 2))
+
+        self._cells: np.ndarray = np.zeros((0, 2), dtype=np.int64)  # cell of each entity
+        self._order: np.ndarray = np.zeros(0, dtype=np.int64)  # entity indices, sorted by cell key
+        self._sorted_keys: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._bounds: Tuple[float, float, float, float] = (0, 0, 0, 0)  # min x, min y, max x, max y of all positions
+
+    @staticmethod
+    def _key(cell_x: np.ndarray, cell_y: np.ndarray) -> np.ndarray:
+        return (cell_x + _CELL_OFFSET) * _CELL_STRIDE + (cell_y + _CELL_OFFSET)
+
+    def rebuild(self, entities: List[Entity], positions: np.ndarray, cell_size: int):
+        """
+        Clear the grid and re-add all entities given, using positions as an (n, 2) array of their positions. Intended
+        to be called once per tick.
+        """
+        self.cell_size = cell_size
+        self.entities = entities
+        self.positions = positions
+
+        self._cells = np.floor_divide(positions, cell_size).astype(np.int64)
+        keys = self._key(self._cells[:, 0], self._cells[:, 1])
+        self._order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[self._order]
+
+        if len(positions):
+            min_x, min_y = positions.min(axis=0).tolist()
+            max_x, max_y = positions.max(axis=0).tolist()
+            self._bounds = (min_x, min_y, max_x, max_y)
+
+    def _expand(self, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """
+        Expand a set of [start, start + count) ranges of the sorted keys in to one flat array of entity indices.
+        """
+        total = counts.sum()
+        offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return self._order[np.arange(total) + offsets]
+
+    def _in_area(self, min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+        """
+        Get the indices of all entities in the cells that cover an area. Indices are sorted.
+        """
+        cell_size = self.cell_size
+        columns = np.arange(int(min_x // cell_size), int(max_x // cell_size) + 1)
+
+        # within a column, keys for consecutive rows are consecutive, so each column is one range of the sorted keys
+        starts = np.searchsorted(self._sorted_keys, self._key(columns, int(min_y // cell_size)), "left")
+        ends = np.searchsorted(self._sorted_keys, self._key(columns, int(max_y // cell_size)), "right")
+
+        return np.sort(self._expand(starts, ends - starts))
+
+    def within(self, pos, radius: float) -> np.ndarray:
+        """
+        Get the indices, in order, of all entities closer to the position than the radius.
+        """
+        if not len(self.entities):
+            return np.zeros(0, dtype=np.int64)
+
+        indices = self._in_area(pos[0] - radius, pos[1] - radius, pos[0] + radius, pos[1] + radius)
+        offset = self.positions[indices] - (pos[0], pos[1])
+        dis = np.sqrt(offset[:, 0] ** 2 + offset[:, 1] ** 2)
+
+        return indices[dis < radius]
+
+    def nearest(self, pos) -> Tuple[int, float]:
+        """
+        Get the index of the entity closest to the position, and its distance. Ties go to the lower index. Returns
+        (-1, inf) if there are no entities.
+        """
+        if not len(self.entities):
+            return -1, float("inf")
+
+        min_x, min_y, max_x, max_y = self._bounds
+        search = self.cell_size
+        while True:
+            # anything outside the searched cells is further than the search distance so can't be closer than a
+            # candidate that is within it
+            covers_all = (pos[0] - search <= min_x) and (pos[0] + search >= max_x)
+            covers_all = covers_all and (pos[1] - search <= min_y) and (pos[1] + search >= max_y)
+            indices = self._in_area(pos[0] - search, pos[1] - search, pos[0] + search, pos[1] + search)
+
+            if len(indices):
+                offset = self.positions[indices] - (pos[0], pos[1])
+                dis = np.sqrt(offset[:, 0] ** 2 + offset[:, 1] ** 2)
+                closest = int(np.argmin(dis))
+                if covers_all or dis[closest] <= search:
+                    return int(indices[closest]), float(dis[closest])
+
+            search *= 2
+
+    def _pairs_near_cells(self, cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the entities in, or adjacent to, each of an (n, 2) array of cells. Returns two arrays, of indices in to the
+        cells and in to the entity list, sorted by the first index and then the second.
+        """
+        count = len(cells)
+        firsts = []
+        seconds = []
+
+        for x in (-1, 0, 1):
+            for y in (-1, 0, 1):
+                keys = self._key(cells[:, 0] + x, cells[:, 1] + y)
+                starts = np.searchsorted(self._sorted_keys, keys, "left")
+                counts = np.searchsorted(self._sorted_keys, keys, "right") - starts
+                if not counts.any():
+                    continue
+
+                firsts.append(np.repeat(np.arange(count), counts))
+                seconds.append(self._expand(starts, counts))
+
+        if not firsts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        first = np.concatenate(firsts)
+        second = np.concatenate(seconds)
+        order = np.lexsort((second, first))
+
+        return first[order], second[order]
+
+    def pairs_near(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the entities in the same or adjacent cells to each of an (n, 2) array of positions. Returns two arrays, of
+        indices in to the positions and in to the entity list, sorted by the first index and then the second.
+        """
+        cells = np.floor_divide(positions, self.cell_size).astype(np.int64)
+        return self._pairs_near_cells(cells)
+
+    def neighbour_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get every ordered pair of different entities that are in the same or adjacent cells. Returns two arrays of
+        indices in to the entity list, sorted by the first index and then the second.
+        """
+        first, second = self._pairs_near_cells(self._cells)
+        different = first != second
+
+        return first[different], second[different]
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from scripts.scenes.combat.elements.spatial_hash import SpatialHash
+
+if TYPE_CHECKING:
+    from typing import Dict, List, Optional
+
+    from scripts.core.game import Game
+    from scripts.scenes.combat.elements.entity import Entity
+
+__all__ = ["TargetIndex"]
+
+
+class TargetIndex:
+    """
+    A spatial index of entities per team, used to find enemies near a position without scanning every entity.
+    Rebuilt once per tick, so positions are as they were at the start of the tick.
+
+    N.B. results are in the order of all_entities, so ties are broken the same way as a scan of all_entities would.
+    """
+
+    def __init__(self, game: Game):
+        self.game: Game = game
+
+        self.hashes: Dict[str, SpatialHash] = {}
+        self.orders: Dict[str, np.ndarray] = {}  # index in all_entities of each entity in the team's hash
+
+    def rebuild(self, entities: List[Entity]):
+        """
+        Clear the index and re-add all entities given.
+        """
+        combat = self.game.combat
+        cell_size = combat.terrain.tile_size * 2
+
+        store = combat.entity_store
+        store.sync(entities)
+        all_positions = store.pos
+
+        teams: Dict[str, List[int]] = {}
+        for i, entity in enumerate(entities):
+            teams.setdefault(entity.team, []).append(i)
+
+        self.hashes = {}
+        self.orders = {}
+        for team, indices in teams.items():
+            order = np.array(indices, dtype=np.int64)
+            spatial_hash = SpatialHash()
+            spatial_hash.rebuild([entities[i] for i in indices], all_positions[order], cell_size)
+            self.hashes[team] = spatial_hash
+            self.orders[team] = order
+
+    def nearest_enemy(self, pos, team: str) -> Optional[Entity]:
+        """
+        Get the entity closest to the position that isn't on the given team. Returns None if there are no enemies.
+        """
+        nearest = None
+        nearest_key = (float("inf"), 0)
+        for other_team, spatial_hash in self.hashes.items():
+            if other_team == team:
+                continue
+
+            index, dis = spatial_hash.nearest(pos)
+            if index == -1:
+                continue
+
+            key = (dis, int(self.orders[other_team][index]))
+            if key < nearest_key:
+                nearest = spatial_hash.entities[index]
+                nearest_key = key
+
+        return nearest
+
+    def enemies_within(self, pos, radius: float, team: str) -> List[Entity]:
+        """
+        Get all entities, not on the given team, closer to the position than the radius.
+        """
+        found = []
+        for other_team, spatial_hash in self.hashes.items():
+            if other_team == team:
+                continue
+
+            order = self.orders[other_team]
+            for index in spatial_hash.within(pos, radius).tolist():
+                found.append((int(order[index]), spatial_hash.entities[index]))
+
+        found.sort(key=lambda item: item[0])
+
+        return [entity for _, entity in found]
@@ -1,46 +1,16 @@
 import random
 
+import numpy as np
 import pygame
 
 from . import map_generator, traps
 from .pathfinder import Pathfinder
 from .tile import Tile
+from .visibility import Visibility
 
 TILE_SIZE = 16
 BARRIER_SIZE = 10
-
-
-def grid_walk(start, end):
-    start = list(start)
-    dx = end[0] - start[0]
-    dy = end[1] - start[1]
-    nx = abs(dx)
-    ny = abs(dy)
-    sign_x = 1 if dx > 0 else -1
-    sign_y = 1 if dy > 0 else -1
-
-    points = []
-
-    ix = iy = 0
-    points.append((start[0], start[1]))
-    while (ix < nx) or (iy < ny):
-        if nx == 0:
-            iy += 1
-            start[1] += sign_y
-            continue
-        if ny == 0:
-            ix += 1
-            start[0] += sign_x
-            continue
-        if (0.5 + ix) / nx < (0.5 + iy) / ny:
-            ix += 1
-            start[0] += sign_x
-        else:
-            iy += 1
-            start[1] += sign_y
-        points.append((start[0], start[1]))
-
-    return points
+CHUNK_SIZE = 16  # width and height, in tiles, of each pre-rendered section of terrain
 
 
 class Terrain:
@@ -53,6 +23,23 @@ class Terrain:
         self.pixel_size = (self.size[0] * TILE_SIZE, self.size[1] * TILE_SIZE)
         self.boundaries = pygame.Rect(0, 0, 2, 2)
         self.pathfinder = Pathfinder(self)
+        self.visibility = Visibility(self)
+        self.version = 0  # bumped whenever solid tiles change, so anything derived from them knows to refresh
+
+        # dense versions of the tile flags, [y, x] and offset by tile_boundaries. Rebuilt by gen_pathfinding_map.
+        self.tile_boundaries = ((0, -1), (0, -1))
+        self.tile_grid = np.zeros((0, 0), dtype=bool)  # whether there is terrain
+        self.solid_grid = np.zeros((0, 0), dtype=bool)
+        self.hoverable_grid = np.zeros((0, 0), dtype=bool)
+        self.sight_block_grid = np.zeros((0, 0), dtype=bool)  # N.B. also True where there is no terrain
+        self._tile_rows = []
+        self._solid_rows = []
+        self._hoverable_rows = []
+        self._grid_rect = (0, 0, 0, 0)  # x, y, width, height of the grids, in tiles
+
+        # pre-rendered static tiles, as {chunk: (surface, tiles to draw live on top)}. Built when first drawn.
+        self.chunks = {}
+
         self.traps = []
         self.trap_density = 0.02
         self.trap_types = ["spinning_blades", "spinning_blades", "pit"]
@@ -68,64 +55,114 @@ class Terrain:
         )
 
     def gen_pathfinding_map(self):
+        self.version += 1
+
         x_coords = [t[0] for t in self.terrain]
         y_coords = [t[1] for t in self.terrain]
         x_tile_boundaries = (min(x_coords), max(x_coords))
         y_tile_boundaries = (min(y_coords), max(y_coords))
         self.tile_boundaries = (x_tile_boundaries, y_tile_boundaries)
 
-        self.pathfinding_array = []
-        for i in range(y_tile_boundaries[1] - y_tile_boundaries[0] + 1):
-            self.pathfinding_array.append([1] * (x_tile_boundaries[1] - x_tile_boundaries[0] + 1))
-
-        for loc in self.terrain:
-            for tile in self.terrain[loc]:
-                if tile.config["solid"]:
-                    path_loc = self.loc_to_path(loc)
-                    self.pathfinding_array[path_loc[1]][path_loc[0]] = 0
+        shape = (y_tile_boundaries[1] - y_tile_boundaries[0] + 1, x_tile_boundaries[1] - x_tile_boundaries[0] + 1)
+        self.tile_grid = np.zeros(shape, dtype=bool)
+        self.solid_grid = np.zeros(shape, dtype=bool)
+        self.hoverable_grid = np.zeros(shape, dtype=bool)
+        self.sight_block_grid = np.ones(shape, dtype=bool)
+        for loc, tiles in self.terrain.items():
+            path_loc = self.loc_to_path(loc)
+            index = (path_loc[1], path_loc[0])
+            self.tile_grid[index] = True
+            self.solid_grid[index] = any(tile.config["solid"] for tile in tiles)
+            self.hoverable_grid[index] = all(tile.config["hoverable"] for tile in tiles)
+            self.sight_block_grid[index] = any(tile.config["sight_block"] for tile in tiles)
+
+        # single tile lookups are much quicker on lists than arrays
+        self._tile_rows = self.tile_grid.tolist()
+        self._solid_rows = self.solid_grid.tolist()
+        self._hoverable_rows = self.hoverable_grid.tolist()
+        self._grid_rect = (x_tile_boundaries[0], y_tile_boundaries[0], shape[1], shape[0])
+
+        self.pathfinding_array = np.where(self.solid_grid, 0, 1).tolist()
 
         self.pathfinder.set_map(self.pathfinding_array)
+        self.visibility.set_map()
 
     def sight_line(self, start, end):
-        start_loc = self.px_to_loc(start)
-        end_loc = self.px_to_loc(end)
-        points = grid_walk(start_loc, end_loc)
-        for p in points:
-            if p in self.terrain:
-                for tile in self.terrain[p]:
-                    if tile.config["sight_block"]:
-                        return False
-            else:
-                return False
-
-        return True
+        return self.visibility.check_line(self.px_to_loc(start), self.px_to_loc(end))
+
+    def sight_lines(self, starts, ends):
+        """
+        Check line of sight between many pairs of positions at once. Takes two (n, 2) arrays of positions and returns an
+        array of n bools.
+        """
+        start_locs = np.floor_divide(np.asarray(starts, dtype=float).reshape(-1, 2), self.tile_size).astype(np.int64)
+        end_locs = np.floor_divide(np.asarray(ends, dtype=float).reshape(-1, 2), self.tile_size).astype(np.int64)
+        return self.visibility.check_lines(start_locs, end_locs)
+
+    def set_tiles(self, loc, tiles):
+        """
+        Replace the tiles at a loc. Use this, rather than changing terrain directly, once the map has been generated so
+        that pathfinding is kept up to date.
+        """
+        self.terrain[loc] = tiles
+        self.chunks.pop(self.loc_to_chunk(loc), None)
+        self.gen_pathfinding_map()
 
     def loc_to_path(self, loc):
         return (loc[0] - self.tile_boundaries[0][0], loc[1] - self.tile_boundaries[1][0])
 
+    @staticmethod
+    def loc_to_chunk(loc):
+        return loc[0] // CHUNK_SIZE, loc[1] // CHUNK_SIZE
+
     def px_to_loc(self, pos):
         loc = (int(pos[0] // self.tile_size), int(pos[1] // self.tile_size))
         return loc
 
+    def _lookup(self, rows, pos, default):
+        """
+        Get the value of the tile at a pixel position from one of the row lists, or default if off the grid.
+        """
+        grid_x, grid_y, width, height = self._grid_rect
+        x = int(pos[0] // self.tile_size) - grid_x
+        y = int(pos[1] // self.tile_size) - grid_y
+        if (0 <= x < width) and (0 <= y < height):
+            return rows[y][x]
+
+        return default
+
+    def _lookup_many(self, grid, positions, default):
+        """
+        Get the value of the tile at each of an (n, 2) array of pixel positions from one of the grids, or default where
+        off the grid.
+        """
+        locs = np.floor_divide(np.asarray(positions, dtype=float).reshape(-1, 2), self.tile_size).astype(np.int64)
+        x = locs[:, 0] - self.tile_boundaries[0][0]
+        y = locs[:, 1] - self.tile_boundaries[1][0]
+        height, width = grid.shape
+        on_grid = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+
+        values = np.full(len(locs), default, dtype=bool)
+        values[on_grid] = grid[y[on_grid], x[on_grid]]
+        return values
+
     def check_tile_solid(self, pos):
-        loc = self.px_to_loc(pos)
-        if loc in self.terrain:
-            for tile in self.terrain[loc]:
-                if tile.config["solid"]:
-                    return True
+        return self._lookup(self._solid_rows, pos, False)
 
-        return False
+    def check_tiles_solid(self, positions):
+        """
+        check_tile_solid for an (n, 2) array of positions. Returns an array of n bools.
+        """
+        return self._lookup_many(self.solid_grid, positions, False)
 
     def check_tile_hoverable(self, pos):
-        loc = self.px_to_loc(pos)
-        if loc in self.terrain:
-            for tile in self.terrain[loc]:
-                if not tile.config["hoverable"]:
-                    return False
-        else:
-            return False
+        return self._lookup(self._hoverable_rows, pos, False)
 
-        return True
+    def check_tiles_hoverable(self, positions):
+        """
+        check_tile_hoverable for an (n, 2) array of positions. Returns an array of n bools.
+        """
+        return self._lookup_many(self.hoverable_grid, positions, False)
 
     def tile_rect(self, loc):
         if loc in self.terrain:
@@ -133,21 +170,70 @@ class Terrain:
         return None
 
     def tile_rect_px(self, pos):
-        loc = self.px_to_loc(pos)
-        return self.tile_rect(loc)
+        if self._lookup(self._tile_rows, pos, False):
+            loc = self.px_to_loc(pos)
+            return pygame.Rect(loc[0] * self.tile_size, loc[1] * self.tile_size, self.tile_size, self.tile_size)
+        return None
 
     def generate(self, biome):
         map_generator.generate(self.game, self, biome)
+        self.chunks = {}
         self.gen_pathfinding_map()
 
     def update(self, dt):
         for trap in self.traps:
             trap.update(dt)
 
+    def get_chunk(self, chunk):
+        """
+        Get the pre-rendered surface for a chunk and the tiles in it that must be drawn live, building them if needed.
+
+        N.B. animated tiles, and anything stacked on them, are drawn live so they stay above the tiles beneath them.
+        """
+        if chunk not in self.chunks:
+            chunk_px_size = CHUNK_SIZE * self.tile_size
+            surface = pygame.Surface((chunk_px_size, chunk_px_size), pygame.SRCALPHA)
+            origin = (chunk[0] * chunk_px_size, chunk[1] * chunk_px_size)
+            live_tiles = []
+
+            for y in range(chunk[1] * CHUNK_SIZE, (chunk[1] + 1) * CHUNK_SIZE):
+                for x in range(chunk[0] * CHUNK_SIZE, (chunk[0] + 1) * CHUNK_SIZE):
+                    tiles = self.terrain.get((x, y), [])
+                    for i, tile in enumerate(tiles):
+                        if tile.group[-8:] == "animated":
+                            live_tiles += tiles[i:]
+                            break
+                        tile.render(self.game, surface, origin)
+
+            self.chunks[chunk] = (surface, live_tiles)
+
+        return self.chunks[chunk]
+
     def render(self, surface: pygame.Surface, offset=(0, 0)):
-        for loc in self.terrain:
-            for tile in self.terrain[loc]:
-                tile.render(self.game, surface, self.game.combat.camera.pos)
+        camera_pos = self.game.combat.camera.pos
+        chunk_px_size = CHUNK_SIZE * self.tile_size
+        first_chunk = (int(camera_pos[0] // chunk_px_size), int(camera_pos[1] // chunk_px_size))
+        last_chunk = (
+            int((camera_pos[0] + surface.get_width()) // chunk_px_size),
+            int((camera_pos[1] + surface.get_height()) // chunk_px_size),
+        )
+
+        # only chunks on screen are drawn, so only they need building
+        chunk_locs = [
+            (x, y) for y in range(first_chunk[1], last_chunk[1] + 1) for x in range(first_chunk[0], last_chunk[0] + 1)
+        ]
+        visible_chunks = [self.get_chunk(chunk_loc) for chunk_loc in chunk_locs]
+        surface.blits(
+            [
+                (chunk_surface, (x * chunk_px_size - camera_pos[0], y * chunk_px_size - camera_pos[1]))
+                for (chunk_surface, _), (x, y) in zip(visible_chunks, chunk_locs)
+            ],
+            doreturn=False,
+        )
+
+        for _, live_tiles in visible_chunks:
+            for tile in live_tiles:
+                tile.render(self.game, surface, camera_pos)
 
         for trap in self.traps:
             trap.render(surface, self.game.combat.camera.render_offset())
@@ -1,14 +1,12 @@
-from copy import deepcopy
-
-
 class Tile:
+    __slots__ = ("type", "loc", "config")
+
     def __init__(self, tile_type, location, tile_config):
         self.type = tile_type
         self.loc = list(location)
 
-        self.config = deepcopy(tile_config[("default", 0, 0)])
-        if tuple(self.type) in tile_config:
-            self.config.update(tile_config[tuple(self.type)])
+        # shared by every tile of this type, so must not be changed
+        self.config = tile_config.get(tuple(tile_type), tile_config[("default", 0, 0)])
 
     @property
     def group(self):
@@ -1,21 +1,53 @@
 from __future__ import annotations
 
 import math
-import random
 from typing import TYPE_CHECKING
 
 import pygame
 
 from scripts.core.constants import StatModifiedStatus
-from scripts.core.utility import itr
+from scripts.core.utility import convex_hull, itr
 from scripts.scenes.combat.elements.entity import Entity
 
 if TYPE_CHECKING:
-    from typing import Dict, List, Tuple
+    from typing import Dict, List, Optional, Tuple
 
     from scripts.core.game import Game
 
-__all__ = ["Unit"]
+__all__ = ["Unit", "StatModifier", "MODIFIABLE_STATS"]
+
+# stats that modifiers change
+MODIFIABLE_STATS = ("health", "attack", "defence", "range", "attack_speed", "move_speed", "ammo")
+
+BORDER_PADDING = 10  # distance the border is pushed out from the entities
+BORDER_TOLERANCE = 2  # how far, in pixels, any corner of the border can move before it is redrawn
+BORDER_SURFACE_STEP = 32  # border surfaces are sized in multiples of this, so they can be reused as the unit moves
+
+
+class StatModifier:
+    """
+    A change to one of a unit's stats, either a flat amount or a multiplier. Lasts until removed, unless given a
+    duration, in seconds of combat.
+    """
+
+    def __init__(self, amount: float, is_multiplier: bool = False, duration: Optional[float] = None):
+        self.amount: float = amount
+        self.is_multiplier: bool = is_multiplier
+        self.time_remaining: Optional[float] = duration  # None if it doesn't expire
+
+    @property
+    def is_positive(self) -> bool:
+        if self.is_multiplier:
+            return self.amount > 1
+
+        return self.amount > 0
+
+    @property
+    def is_negative(self) -> bool:
+        if self.is_multiplier:
+            return self.amount < 1
+
+        return self.amount < 0
 
 
 class Unit:
@@ -59,7 +91,11 @@ class Unit:
         )
         self.entity_spread_max = unit_data["entity_spread"] if "entity_spread" in unit_data else 48
 
-        self.modifiers: Dict[str, List[int]] = {}
+        # modified stats are worked out when modifiers change, rather than each time they're read
+        self._modifiers: Dict[str, List[StatModifier]] = {}
+        self._expiring_modifiers: List[Tuple[str, StatModifier]] = []  # (stat, modifier) of those with a duration
+        self._stats: Dict[str, float] = {}  # each of MODIFIABLE_STATS with its modifiers applied
+        self.modifiers = {}
 
         self.injuries: int = 0
 
@@ -76,149 +112,140 @@ class Unit:
         self.pos: List[int, int] = [0, 0]
         self.placed: bool = False
 
+        # border drawn around player units, relative to the unit's position
+        self.border_surface: Optional[pygame.Surface] = None
+        self.border_surface_outline: Optional[pygame.Surface] = None
+        self.border_surface_outline_black: Optional[pygame.Surface] = None
+        self.border_surface_offset: Tuple[int, int] = (0, 0)
+        self.border_hull: List[Tuple[float, float]] = []
+
+    def __getstate__(self):
+        # surfaces can't be pickled, so the border is dropped and redrawn by gen_border_surface
+        state = self.__dict__.copy()
+        state["border_surface"] = None
+        state["border_surface_outline"] = None
+        state["border_surface_outline_black"] = None
+        state["border_hull"] = []
+        return state
+
     @property
-    def health(self) -> int:
-        value = self._health
+    def modifiers(self) -> Dict[str, List[StatModifier]]:
+        """
+        Modifiers on each stat. Change them through add_modifier and remove_modifier, so stats are kept up to date.
+        """
+        return self._modifiers
 
-        try:
-            for mod in self.modifiers["health"]:
-                value += mod
+    @modifiers.setter
+    def modifiers(self, modifiers: Dict[str, List[StatModifier]]):
+        self._modifiers = modifiers
+        self._expiring_modifiers = [
+            (stat, modifier)
+            for stat, stat_modifiers in modifiers.items()
+            for modifier in stat_modifiers
+            if modifier.time_remaining is not None
+        ]
 
-        except KeyError:
-            pass
+        for stat in MODIFIABLE_STATS:
+            self._update_stat(stat)
 
-        return int(value)
+    @property
+    def health(self) -> int:
+        return self._stats["health"]
 
     @property
     def attack(self) -> int:
-        value = self._attack
-
-        try:
-            for mod in self.modifiers["attack"]:
-                value += mod
-
-        except KeyError:
-            pass
-
-        return int(value)
+        return self._stats["attack"]
 
     @property
     def defence(self) -> int:
-        value = self._defence
-
-        try:
-            for mod in self.modifiers["defence"]:
-                value += mod
-
-        except KeyError:
-            pass
-
-        return int(value)
+        return self._stats["defence"]
 
     @property
     def attack_speed(self) -> float:
-        value = self._attack_speed
-
-        try:
-            for mod in self.modifiers["attack_speed"]:
-                value += mod
-
-        except KeyError:
-            pass
-
-        return value
+        return self._stats["attack_speed"]
 
     @property
     def range(self) -> int:
-        value = self._range
-
-        try:
-            for mod in self.modifiers["range"]:
-                value += mod
-
-        except KeyError:
-            pass
-
-        return int(value)
+        return self._stats["range"]
 
     @property
     def move_speed(self) -> int:
-        value = self._move_speed
-
-        try:
-            for mod in self.modifiers["move_speed"]:
-                value += mod
-
-        except KeyError:
-            pass
-
-        return int(value)
+        return self._stats["move_speed"]
 
     @property
     def ammo(self) -> int:
-        value = self._ammo
-
-        try:
-            for mod in self.modifiers["ammo"]:
-                value += mod
-
-        except KeyError:
-            pass
-
-        return value
+        return self._stats["ammo"]
 
     def gen_border_surface(self):
-        if len(self.entities):
-            surf_padding = 20
-            outline_padding = 10
-            self.border_surface = None
-            all_positions = [entity.pos for entity in self.entities]
-            all_x = [p[0] for p in all_positions]
-            all_y = [p[1] for p in all_positions]
-            min_x = min(all_x)
-            min_y = min(all_y)
-            self.border_surface = pygame.Surface(
-                (max(all_x) - min_x + surf_padding * 2, max(all_y) - min_y + surf_padding * 2)
+        """
+        Draw the border around the unit: the convex hull of its entities, pushed out from the unit's position. Only
+        redrawn if the border has moved, relative to the unit, by more than BORDER_TOLERANCE.
+        """
+        if not len(self.entities):
+            return
+
+        # anchor points around the unit's position keep the border from collapsing around small units
+        offsets = [
+            (-BORDER_PADDING, 0),
+            (0, -BORDER_PADDING),
+            (BORDER_PADDING, 0),
+            (0, BORDER_PADDING),
+        ]
+        for entity in self.entities:
+            offsets.append((entity.pos[0] - self.pos[0], entity.pos[1] - self.pos[1]))
+
+        # push every point out from the unit's position, anchors included
+        points = []
+        for x, y in offsets:
+            angle = math.atan2(y, x)
+            points.append((x + BORDER_PADDING * math.cos(angle), y + BORDER_PADDING * math.sin(angle)))
+
+        hull = convex_hull(points)
+        if len(hull) == len(self.border_hull):
+            moved = any(
+                abs(x - old_x) > BORDER_TOLERANCE or abs(y - old_y) > BORDER_TOLERANCE
+                for (x, y), (old_x, old_y) in zip(hull, self.border_hull)
             )
-            self.border_surface_offset = (self.pos[0] - min_x + surf_padding, self.pos[1] - min_y + surf_padding)
+            if not moved:
+                return
+        self.border_hull = hull
+
+        # leave room for the outline
+        surf_padding = 2
+        min_x = min(x for x, _ in hull)
+        min_y = min(y for _, y in hull)
+        width = int(max(x for x, _ in hull) - min_x) + surf_padding * 2 + 1
+        height = int(max(y for _, y in hull) - min_y) + surf_padding * 2 + 1
+
+        # reuse the surfaces unless the border has outgrown them
+        surface = self.border_surface
+        if (surface is None) or (surface.get_width() < width) or (surface.get_height() < height):
+            size = (
+                -(-width // BORDER_SURFACE_STEP) * BORDER_SURFACE_STEP,
+                -(-height // BORDER_SURFACE_STEP) * BORDER_SURFACE_STEP,
+            )
+            self.border_surface = pygame.Surface(size)
             self.border_surface.set_colorkey((0, 0, 0))
-
-            points = [
-                (self.pos[0] - outline_padding, self.pos[1]),
-                (self.pos[0], self.pos[1] - outline_padding),
-                (self.pos[0] + outline_padding, self.pos[1]),
-                (self.pos[0], self.pos[1] + outline_padding),
-            ]
-
-            placed_points = []
-
-            for pos in all_positions + points:
-                new_pos = (pos[0] - min_x + surf_padding, pos[1] - min_y + surf_padding)
-                angle = math.atan2(pos[1] - self.pos[1], pos[0] - self.pos[0])
-                new_pos = (
-                    new_pos[0] + outline_padding * math.cos(angle),
-                    new_pos[1] + outline_padding * math.sin(angle),
-                )
-                for p in placed_points:
-                    pygame.draw.line(self.border_surface, (255, 255, 255), new_pos, p)
-                placed_points.append(new_pos)
-
-            mask_surf = pygame.mask.from_surface(self.border_surface)
-
+            self.border_surface.set_alpha(80)
+            self.border_surface_outline = pygame.Surface(size)
+            self.border_surface_outline.set_colorkey((0, 0, 0))
+            self.border_surface_outline_black = pygame.Surface(size)
+            self.border_surface_outline_black.set_colorkey((0, 0, 0))
+        else:
             self.border_surface.fill((0, 0, 0))
-            self.border_surface_outline = self.border_surface.copy()
-            self.border_surface_outline_black = self.border_surface.copy()
+            self.border_surface_outline.fill((0, 0, 0))
+            self.border_surface_outline_black.fill((0, 0, 0))
 
-            outline = mask_surf.outline(2)
-            pygame.draw.lines(self.border_surface_outline, (255, 255, 255), False, outline)
-            pygame.draw.lines(self.border_surface_outline_black, (0, 0, 1), False, outline)
-            pygame.draw.polygon(self.border_surface, (0, 0, 255), outline)
-            self.border_surface.set_alpha(80)
+        self.border_surface_offset = (surf_padding - min_x, surf_padding - min_y)
+        outline = [(x - min_x + surf_padding, y - min_y + surf_padding) for x, y in hull]
+        pygame.draw.polygon(self.border_surface, (0, 0, 255), outline)
+        pygame.draw.lines(self.border_surface_outline, (255, 255, 255), True, outline)
+        pygame.draw.lines(self.border_surface_outline_black, (0, 0, 1), True, outline)
 
     def update(self, dt):
         self.update_pos()
 
-        if self.team == "player":
+        if self.team == "player" and not self.game.combat.is_headless:
             self.border_surface_timer += dt
             if self.border_surface_timer > 0.5:
                 self.border_surface_timer -= 0.5
@@ -227,6 +254,10 @@ class Unit:
         # a unit is alive if all of its entities are alive
         self.alive = bool(len(self.entities))
 
+        # temporary modifiers only run down while combat is running
+        if self._expiring_modifiers and not self.game.combat.force_idle:
+            self.update_modifiers(dt)
+
         if self.game.combat.force_idle == False:
             self.behaviour.process(dt)
 
@@ -242,7 +273,9 @@ class Unit:
                 self.dead_entities.append(entity)
 
     def render(self, surface: pygame.Surface, shift=(0, 0)):
-        if self.team == "player":
+        # N.B. there is no border if the unit has never had entities to draw it around, e.g. if restored after being
+        # wiped out
+        if self.team == "player" and self.border_surface is not None:
             for d in [(-1, 0), (1, 0), (0, 1), (0, -1)]:
                 surface.blit(
                     self.border_surface_outline_black,
@@ -297,6 +330,11 @@ class Unit:
 
         self.entities = []
         self.dead_entities = []
+        self.border_hull = []
+
+        # temporary modifiers only last for the combat they were added in
+        for stat, modifier in list(self._expiring_modifiers):
+            self.remove_modifier(stat, modifier)
 
     def spawn_entities(self):
         """
@@ -309,8 +347,8 @@ class Unit:
         self.update_pos()
 
         # stuff for the border surface (updates every 0.5s)
-        if self.team == "player":
-            self.border_surface_timer = random.random() * 0.5
+        if self.team == "player" and not self.game.combat.is_headless:
+            self.border_surface_timer = self.game.rng.cosmetic.random() * 0.5
             self.gen_border_surface()
 
     def update_pos(self):
@@ -325,15 +363,88 @@ class Unit:
             self.pos[0] = pos[0] / len(self.entities)
             self.pos[1] = pos[1] / len(self.entities)
 
-    def add_modifier(self, stat: str, amount: int):
+    def add_modifier(
+        self, stat: str, amount: float, is_multiplier: bool = False, duration: Optional[float] = None
+    ) -> StatModifier:
         """
-        Add a modifier to a stat.
+        Add a modifier to a stat. If a duration is given, in seconds, the modifier is removed once that much combat
+        has passed. Returns the modifier, so it can be removed later.
         """
-        if stat in self.modifiers:
-            self.modifiers[stat].append(amount)
+        modifier = StatModifier(amount, is_multiplier, duration)
+
+        if stat in self._modifiers:
+            self._modifiers[stat].append(modifier)
 
         else:
-            self.modifiers[stat] = [amount]
+            self._modifiers[stat] = [modifier]
+
+        if duration is not None:
+            self._expiring_modifiers.append((stat, modifier))
+
+        self._update_stat(stat)
+
+        return modifier
+
+    def remove_modifier(self, stat: str, modifier: StatModifier):
+        """
+        Remove a modifier from a stat. Does nothing if the stat doesn't have the modifier.
+        """
+        stat_modifiers = self._modifiers.get(stat, [])
+        if not any(stat_modifier is modifier for stat_modifier in stat_modifiers):
+            return
+
+        stat_modifiers.remove(modifier)
+
+        # a stat without modifiers isn't shown as modified
+        if not stat_modifiers:
+            del self._modifiers[stat]
+
+        if modifier.time_remaining is not None:
+            self._expiring_modifiers = [item for item in self._expiring_modifiers if item[1] is not modifier]
+
+        self._update_stat(stat)
+
+    def update_modifiers(self, dt: float):
+        """
+        Run down the modifiers that have a duration and remove any that have run out.
+        """
+        expired = []
+        for stat, modifier in self._expiring_modifiers:
+            modifier.time_remaining -= dt
+            if modifier.time_remaining <= 0:
+                expired.append((stat, modifier))
+
+        for stat, modifier in expired:
+            self.remove_modifier(stat, modifier)
+
+    def _update_stat(self, stat: str):
+        """
+        Work out a stat from its base value and modifiers. Flat amounts are added before multipliers are applied.
+        """
+        if stat not in MODIFIABLE_STATS:
+            return
+
+        value = getattr(self, f"_{stat}")
+
+        # -1 ammo means the unit doesn't use ammo, which modifiers can't change
+        if stat == "ammo" and value == -1:
+            self._stats[stat] = value
+            return
+
+        multiplier = 1
+        for modifier in self._modifiers.get(stat, []):
+            if modifier.is_multiplier:
+                multiplier *= modifier.amount
+            else:
+                value += modifier.amount
+
+        value *= multiplier
+
+        # attack speed is the only stat that isn't a whole number
+        if stat != "attack_speed":
+            value = int(value)
+
+        self._stats[stat] = value
 
     def get_modified_status(self, stat: str) -> StatModifiedStatus:
         """
@@ -342,8 +453,8 @@ class Unit:
         modifiers = self.modifiers
 
         if stat in modifiers:
-            has_negatives = any(n < 0 for n in modifiers[stat])
-            has_positives = any(n > 0 for n in modifiers[stat])
+            has_negatives = any(modifier.is_negative for modifier in modifiers[stat])
+            has_positives = any(modifier.is_positive for modifier in modifiers[stat])
 
             if has_negatives and has_positives:
                 status = StatModifiedStatus.POSITIVE_AND_NEGATIVE
@@ -1,5 +1,3 @@
-import random
-
 from .behaviour import Behaviour
 
 REGROUP_RANGE = 32
@@ -34,16 +32,12 @@ class Base(Behaviour):
         """
         Find the nearest enemy from a different team and update the target.
         """
-        nearest = [None, 9999999]
-        for entity in self.game.combat.all_entities:
-            if entity.team != self.unit.team:
-                dis = entity.dis(self.unit)
-                if dis < nearest[1]:
-                    nearest = [entity, dis]
+        nearest = self.game.combat.target_index.nearest_enemy(self.unit.pos, self.unit.team)
 
-        if nearest[0]:
-            self.target_unit = nearest[0].unit
-            self.reference_entity = random.choice(nearest[0].unit.entities)
+        # N.B. the index is built at the start of the tick, so the nearest unit may have lost all its entities since
+        if nearest and len(nearest.unit.entities):
+            self.target_unit = nearest.unit
+            self.reference_entity = self.game.rng.gameplay.choice(nearest.unit.entities)
         else:
             self.target_unit = None
             self.reference_entity = None
@@ -82,7 +76,7 @@ class Base(Behaviour):
             # update reference entity when it dies
             if self.target_unit and self.target_unit.alive and (not self.reference_entity.alive):
                 if len(self.target_unit.entities):
-                    self.reference_entity = random.choice(self.target_unit.entities)
+                    self.reference_entity = self.game.rng.gameplay.choice(self.target_unit.entities)
                 else:
                     self.target_unit = None
                     # regroup/retreat since target unit died
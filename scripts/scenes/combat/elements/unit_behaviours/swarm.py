@@ -11,15 +11,10 @@ class Swarm(Behaviour):
         """
         Find the nearest enemy from a different team and update the target.
         """
-        nearest = [None, 9999999]
-        for entity in self.game.combat.all_entities:
-            if entity.team != self.unit.team:
-                dis = entity.dis(self.unit)
-                if dis < nearest[1]:
-                    nearest = [entity, dis]
+        nearest = self.game.combat.target_index.nearest_enemy(self.unit.pos, self.unit.team)
 
-        self.target = nearest[0]
-        if nearest[0]:
+        self.target = nearest
+        if nearest:
             self.target_pos = self.target.pos
         else:
             self.target_pos = None
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import bisect
 from typing import TYPE_CHECKING
 
 import pygame
 
 if TYPE_CHECKING:
-    pass
+    from typing import List, Tuple
+
+    from scripts.scenes.combat.elements.entity import Entity
 
 __all__ = ["UnitManager"]
 
@@ -16,6 +19,12 @@ class UnitManager:
 
         self.units = []
 
+        # entities in the order they are drawn. Living entities move so are re-sorted each frame, which is quick as
+        # the order barely changes. The dead don't move so are kept sorted, by depth, as they are added.
+        self.living_layer: List[Entity] = []
+        self.dead_layer: List[Tuple[float, int, Entity]] = []
+        self._dead_added = 0  # to keep the order of dead entities with the same depth
+
     def add_unit_to_combat(self, unit):
         unit.reset_for_combat()
         unit.spawn_entities()
@@ -25,20 +34,59 @@ class UnitManager:
         for unit in self.units:
             unit.update(self.game.combat.dt)
 
-    def render(self, surface: pygame.Surface, offset=(0, 0)):
-        for unit in self.units:
-            unit.render(surface, shift=offset)
+        self.game.combat.push_solver.solve(self.game.combat.dt)
 
-        # organize entities for layered rendering
-        entity_list = []
+    def _update_layers(self):
+        """
+        Move newly dead entities to the dead layer, and rebuild the layers if entities have been added or removed.
+        """
+        living = self.living_layer
+        if any(not entity.alive for entity in living):
+            self.living_layer = []
+            for entity in living:
+                if entity.alive:
+                    self.living_layer.append(entity)
+                else:
+                    self._add_dead(entity)
+
+        count = sum(len(unit.entities) + len(unit.dead_entities) for unit in self.units)
+        if count != len(self.living_layer) + len(self.dead_layer):
+            self.living_layer = []
+            self.dead_layer = []
+            for unit in self.units:
+                for entity in unit.entities + unit.dead_entities:
+                    if entity.alive:
+                        self.living_layer.append(entity)
+                    else:
+                        self._add_dead(entity)
+
+    def _add_dead(self, entity: Entity):
+        bisect.insort(self.dead_layer, (entity.depth, self._dead_added, entity))
+        self._dead_added += 1
+
+    def render(self, surface: pygame.Surface, offset=(0, 0), alpha=1):
+        """
+        Draw the units and their entities. Entities are drawn part way, by alpha, between where they were at the start
+        of the latest tick and where they are now.
+        """
         for unit in self.units:
-            for entity in unit.entities + unit.dead_entities:
-                entity_list.append((entity.pos[1] + entity.img.get_height() // 2, len(entity_list), entity))
+            unit.render(surface, shift=offset)
 
-        entity_list.sort()
+        self._update_layers()
+        self.living_layer.sort(key=lambda entity: entity.depth)
 
-        for entity in entity_list:
-            entity[2].render(surface, shift=offset)
+        # the dead are drawn under the living
+        animations = self.game.assets.unit_animations
+        blits = []
+        for entity in [entity for _, _, entity in self.dead_layer] + self.living_layer:
+            if entity.type in animations:
+                blits.append(entity.get_blit(offset, alpha))
+            else:
+                # keep the draw order for anything that can't be blitted
+                surface.blits(blits, doreturn=False)
+                blits = []
+                entity.render(surface, shift=offset, alpha=alpha)
+        surface.blits(blits, doreturn=False)
 
         for unit in self.units:
             unit.post_render(surface, shift=offset)
@@ -0,0 +1,146 @@
+import numpy as np
+
+LOS_CACHE_SIZE = 65536  # max number of tile pairs to remember line of sight for
+
+
+def grid_walk(start, end):
+    start = list(start)
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    nx = abs(dx)
+    ny = abs(dy)
+    sign_x = 1 if dx > 0 else -1
+    sign_y = 1 if dy > 0 else -1
+
+    points = []
+
+    ix = iy = 0
+    points.append((start[0], start[1]))
+    while (ix < nx) or (iy < ny):
+        if nx == 0:
+            iy += 1
+            start[1] += sign_y
+            continue
+        if ny == 0:
+            ix += 1
+            start[0] += sign_x
+            continue
+        if (0.5 + ix) / nx < (0.5 + iy) / ny:
+            ix += 1
+            start[0] += sign_x
+        else:
+            iy += 1
+            start[1] += sign_y
+        points.append((start[0], start[1]))
+
+    return points
+
+
+class Visibility:
+    """
+    Answers line of sight queries between tiles, using the terrain's grid of sight blocking tiles. Results between
+    tiles are remembered until the terrain changes.
+
+    N.B. a line is blocked by any tile it passes through that blocks sight or has no terrain.
+    """
+
+    def __init__(self, terrain):
+        self.terrain = terrain
+        self.blocked = np.ones((0, 0), dtype=bool)  # [y, x], True where sight is blocked
+        self.los_cache = {}
+        self._blocked_rows = []
+
+    def set_map(self):
+        """
+        Take the grid of sight blocking tiles from the terrain and forget all remembered results.
+        """
+        self.blocked = self.terrain.sight_block_grid
+
+        # single tile lookups are much quicker on lists than arrays
+        self._blocked_rows = self.blocked.tolist()
+        self.los_cache = {}
+
+    def is_blocked(self, loc):
+        x = loc[0] - self.terrain.tile_boundaries[0][0]
+        y = loc[1] - self.terrain.tile_boundaries[1][0]
+        if (0 <= y < len(self._blocked_rows)) and (0 <= x < len(self._blocked_rows[0])):
+            return self._blocked_rows[y][x]
+
+        return True
+
+    def check_line(self, start_loc, end_loc):
+        """
+        Check if there is line of sight between two tiles.
+        """
+        key = (start_loc, end_loc)
+        visible = self.los_cache.get(key)
+        if visible is None:
+            visible = not any(self.is_blocked(loc) for loc in grid_walk(start_loc, end_loc))
+
+            # dropping everything is far cheaper than tracking use, and the cache refills quickly
+            if len(self.los_cache) >= LOS_CACHE_SIZE:
+                self.los_cache = {}
+            self.los_cache[key] = visible
+
+        return visible
+
+    def check_lines(self, start_locs, end_locs):
+        """
+        Check line of sight for many pairs of tiles at once. Takes two (n, 2) arrays of locs and returns an array of n
+        bools. Gives the same results as check_line.
+        """
+        start_locs = np.asarray(start_locs, dtype=np.int64).reshape(-1, 2)
+        end_locs = np.asarray(end_locs, dtype=np.int64).reshape(-1, 2)
+        count = len(start_locs)
+
+        delta = end_locs - start_locs
+        nx = np.abs(delta[:, 0])
+        ny = np.abs(delta[:, 1])
+        sign_x = np.where(delta[:, 0] > 0, 1, -1)
+        sign_y = np.where(delta[:, 1] > 0, 1, -1)
+
+        # grid_walk only records the start of straight horizontal or vertical lines
+        diagonal = (nx > 0) & (ny > 0)
+        nx = np.where(diagonal, nx, 0)
+        ny = np.where(diagonal, ny, 0)
+
+        # grid_walk takes its i-th x step at (0.5 + i) / nx and its j-th y step at (0.5 + j) / ny, with y first on a
+        # tie. As only the set of tiles visited matters, the tile after each step can be found directly.
+        pair_x = np.repeat(np.arange(count), nx)
+        i = np.arange(len(pair_x)) - np.repeat(np.cumsum(nx) - nx, nx)
+        # y steps taken at or before x step i
+        steps_y = ((2 * i + 1) * ny[pair_x] - nx[pair_x]) // (2 * nx[pair_x]) + 1
+        steps_y = np.clip(steps_y, 0, ny[pair_x])
+        tiles_x = np.stack(
+            (
+                start_locs[pair_x, 0] + sign_x[pair_x] * (i + 1),
+                start_locs[pair_x, 1] + sign_y[pair_x] * steps_y,
+            ),
+            axis=1,
+        )
+
+        pair_y = np.repeat(np.arange(count), ny)
+        j = np.arange(len(pair_y)) - np.repeat(np.cumsum(ny) - ny, ny)
+        # x steps taken strictly before y step j
+        steps_x = -((ny[pair_y] - (2 * j + 1) * nx[pair_y]) // (2 * ny[pair_y]))
+        steps_x = np.clip(steps_x, 0, nx[pair_y])
+        tiles_y = np.stack(
+            (
+                start_locs[pair_y, 0] + sign_x[pair_y] * steps_x,
+                start_locs[pair_y, 1] + sign_y[pair_y] * (j + 1),
+            ),
+            axis=1,
+        )
+
+        pairs = np.concatenate((np.arange(count), pair_x, pair_y))
+        tiles = np.concatenate((start_locs, tiles_x, tiles_y))
+
+        # look up the tiles, treating anything off the grid as blocked
+        x = tiles[:, 0] - self.terrain.tile_boundaries[0][0]
+        y = tiles[:, 1] - self.terrain.tile_boundaries[1][0]
+        height, width = self.blocked.shape
+        on_grid = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        blocked = np.ones(len(tiles), dtype=bool)
+        blocked[on_grid] = self.blocked[y[on_grid], x[on_grid]]
+
+        return np.bincount(pairs, weights=blocked, minlength=count) == 0
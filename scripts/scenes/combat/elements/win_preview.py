@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+from scripts.scenes.combat.elements.troupe import Troupe
+from scripts.scenes.combat.elements.unit import Unit
+from scripts.scenes.combat.headless import HeadlessGame
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from typing import Any, Dict, List, Optional, Tuple
+
+    from scripts.core.game import Game
+
+__all__ = ["WinPreview", "simulate_placement"]
+
+
+PREVIEW_SIMULATIONS = 32  # number of fights simulated for each placement
+
+_worker_game: Optional[HeadlessGame] = None  # each worker process keeps its own game to simulate with
+
+
+def _init_worker():
+    global _worker_game
+    _worker_game = HeadlessGame()
+
+
+def simulate_placement(
+    player_units: List[Dict[str, Any]], enemy_units: List[Dict[str, Any]], biome: str, seed: int
+) -> Dict[str, Any]:
+    """
+    Simulate a single fight between the given units, in a worker process. Units are given as
+    {"id": int, "type": str, "modifiers": dict, "injuries": int, "pos": [x, y]}, so they can be sent between
+    processes. Returns the HeadlessCombat result.
+    """
+    game = _worker_game
+
+    troupes = []
+    positions = {}
+    for team, units in (("player", player_units), ("enemy", enemy_units)):
+        troupe = Troupe(game, team, [])
+        for unit_data in units:
+            unit = Unit(game, unit_data["id"], unit_data["type"], team)
+            unit.modifiers = unit_data["modifiers"]
+            unit.injuries = unit_data["injuries"]
+            troupe.add_unit(unit)
+            positions[unit.id] = unit_data["pos"]
+        troupes.append(troupe)
+
+    return game.combat.simulate(troupes[0], troupes[1], biome=biome, seed=seed, positions=positions)
+
+
+class WinPreview:
+    """
+    Estimates how a fight is likely to go by simulating the current placement many times in background processes.
+    Results arrive over several frames and are restarted whenever a unit is placed.
+
+    N.B. each simulation generates its own map of the same biome, so only placement, not decoration, is matched.
+    """
+
+    def __init__(self, game: Game, simulations: int = PREVIEW_SIMULATIONS):
+        self.game: Game = game
+        self.simulations: int = simulations
+
+        self._executor: Optional[ProcessPoolExecutor] = None  # created when first needed
+        self._futures: List[Future] = []
+        self._placement: Tuple[int, ...] = ()  # ids of the units being simulated
+        self._positions: Dict[int, List[float]] = {}  # where each unit was first seen, as pushes move them slightly
+
+        self.completed: int = 0
+        self.wins: int = 0
+        self.units_lost: int = 0
+
+    @property
+    def win_probability(self) -> Optional[float]:
+        if not self.completed:
+            return None
+
+        return self.wins / self.completed
+
+    @property
+    def expected_losses(self) -> Optional[float]:
+        """
+        Average number of player units lost.
+        """
+        if not self.completed:
+            return None
+
+        return self.units_lost / self.completed
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._futures)
+
+    def update(self):
+        """
+        Restart the simulations if the placement has changed and collect any that have finished. Doesn't wait for
+        simulations to finish.
+        """
+        units = self.game.combat.units.units
+        placement = tuple(unit.id for unit in units)
+        if placement != self._placement:
+            for unit in units:
+                if unit.id not in self._positions:
+                    self._positions[unit.id] = list(unit.pos)
+            self._restart(placement)
+
+        running = []
+        for future in self._futures:
+            if not future.done():
+                running.append(future)
+                continue
+
+            try:
+                result = future.result()
+            except Exception as exception:
+                logging.warning(f"WinPreview: simulation failed. {exception}")
+                continue
+
+            self._add_result(result)
+
+        self._futures = running
+
+    def stop(self):
+        """
+        Cancel any simulations not yet finished and forget all results.
+        """
+        for future in self._futures:
+            future.cancel()
+
+        self._futures = []
+        self._placement = ()
+        self._positions = {}
+        self.completed = 0
+        self.wins = 0
+        self.units_lost = 0
+
+    def shutdown(self):
+        """
+        Stop and close the worker processes.
+        """
+        self.stop()
+        if self._executor is not None:
+            # N.B. stop has already cancelled anything not yet started
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _restart(self, placement: Tuple[int, ...]):
+        positions = self._positions
+        self.stop()
+        self._placement = placement
+        self._positions = positions
+
+        teams = {"player": [], "enemy": []}
+        for unit in self.game.combat.units.units:
+            teams.setdefault(unit.team, []).append(
+                {
+                    "id": unit.id,
+                    "type": unit.type,
+                    "modifiers": {stat: list(mods) for stat, mods in unit.modifiers.items()},
+                    "injuries": unit.injuries,
+                    "pos": positions[unit.id],
+                }
+            )
+
+        # nothing to learn until both sides have units
+        if not (teams["player"] and teams["enemy"]):
+            return
+
+        if self._executor is None:
+            # leave a core for the game itself
+            workers = max(1, (os.cpu_count() or 2) - 1)
+            self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+        # seed from the combat and the placement, so each placement is tried against different fights, but the same
+        # placement always gets the same estimate
+        seed_rng = random.Random(f"{self.game.combat.seed}:{placement}")
+        seeds = [seed_rng.randrange(2 ** 32) for _ in range(self.simulations)]
+
+        biome = self.game.combat.biome
+        self._futures = [
+            self._executor.submit(simulate_placement, teams["player"], teams["enemy"], biome, seed) for seed in seeds
+        ]
+
+    def _add_result(self, result: Dict[str, Any]):
+        self.completed += 1
+        if result["winner"] == "player":
+            self.wins += 1
+
+        for unit_result in result["units"].values():
+            if unit_result["team"] == "player" and not unit_result["alive"]:
+                self.units_lost += 1
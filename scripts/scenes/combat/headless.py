@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import copy
+import logging
+import time
+from typing import TYPE_CHECKING
+
+from scripts.core.constants import COMBAT_STEP
+from scripts.core.data import Data
+from scripts.core.memory import Memory
+from scripts.core.rng import RNG
+from scripts.scenes.combat.elements.entity_store import EntityStore
+from scripts.scenes.combat.elements.projectile_manager import ProjectileManager
+from scripts.scenes.combat.elements.push_solver import PushSolver
+from scripts.scenes.combat.elements.target_index import TargetIndex
+from scripts.scenes.combat.elements.terrain import Terrain
+from scripts.scenes.combat.elements.unit import Unit
+from scripts.scenes.combat.elements.unit_manager import UnitManager
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional
+
+    from scripts.scenes.combat.elements.entity import Entity
+    from scripts.scenes.combat.elements.snapshot import CombatSnapshot
+    from scripts.scenes.combat.elements.troupe import Troupe
+
+__all__ = ["HeadlessGame", "HeadlessCombat"]
+
+
+MAX_COMBAT_DURATION = 300  # seconds of simulated time before a fight is called a draw
+
+
+class HeadlessWindow:
+    """
+    Stand in for the Window. Holds the resolution used to size the combat area but never opens a display.
+    """
+
+    def __init__(self):
+        self.base_resolution = [640, 360]
+        self.dt = COMBAT_STEP
+
+
+class HeadlessParticleManager:
+    """
+    Stand in for the ParticleManager. Particles are purely cosmetic so are discarded.
+    """
+
+    def create_particle_burst(self, *args, **kwargs):
+        pass
+
+
+class HeadlessGame:
+    """
+    A cut down Game that holds only what combat needs. Used to simulate battles without pygame.display, assets or
+    any of the scenes.
+    """
+
+    def __init__(self):
+        # start timer
+        start_time = time.time()
+
+        self.window: HeadlessWindow = HeadlessWindow()
+        self.data: Data = Data(self)
+        self.memory: Memory = Memory(self)
+        self.rng: RNG = RNG(self)
+        self.combat: HeadlessCombat = HeadlessCombat(self)
+
+        self.master_clock = 0
+
+        # record duration
+        end_time = time.time()
+        logging.debug(f"HeadlessGame: initialised in {format(end_time - start_time, '.2f')}s.")
+
+
+class HeadlessCombat:
+    """
+    Runs a combat to completion at a fixed time step, as fast as possible and without rendering. Exposes the same
+    attributes as the CombatScene that the combat elements rely on.
+    """
+
+    def __init__(self, game: HeadlessGame):
+        self.game: HeadlessGame = game
+
+        self.terrain: Terrain = Terrain(self.game)
+        self.units: UnitManager = UnitManager(self.game)
+        self.projectiles: ProjectileManager = ProjectileManager(self.game)
+        self.particles: HeadlessParticleManager = HeadlessParticleManager()
+        self.entity_store: EntityStore = EntityStore(self.game)
+        self.push_solver: PushSolver = PushSolver(self.game)
+        self.target_index: TargetIndex = TargetIndex(self.game)
+
+        self.biome: str = "plains"
+        self.seed: int = 0  # seed of the combat's child random streams
+
+        self.is_headless = True
+        self.force_idle = False
+        self.dt = 0
+        self.tick = 0  # ticks run so far this combat
+        self.elapsed = 0
+
+        self.all_entities: List[Entity] = []
+        self.last_unit_death = None
+
+    def simulate(
+        self,
+        player_troupe: Troupe,
+        enemy_troupe: Troupe,
+        biome: str = "plains",
+        seed: int = 0,
+        positions: Optional[Dict[int, List[float]]] = None,
+        max_duration: float = MAX_COMBAT_DURATION,
+    ) -> Dict[str, Any]:
+        """
+        Simulate a full combat between two troupes and return the result. The troupes' units are copied so are not
+        changed by the combat.
+
+        positions is expressed as {unit.id: [x, y], ...}. Units without a position are placed randomly in their
+        team's starting area.
+        """
+        # handle mutable default
+        if positions is None:
+            positions = {}
+
+        # seed all randomness, including the child streams combat elements draw from
+        self.game.rng.set_seed(seed)
+
+        self.prepare_simulation(seed, biome)
+
+        for troupe, team in ((player_troupe, "player"), (enemy_troupe, "enemy")):
+            for unit in troupe.units.values():
+                pos = positions.get(unit.id, None) or self._get_random_start_pos(team)
+                self._add_unit(unit, team, pos)
+
+        self.all_entities = self.get_all_entities()
+
+        return self._run(max_duration)
+
+    def simulate_from(self, snapshot: CombatSnapshot, max_duration: float = MAX_COMBAT_DURATION) -> Dict[str, Any]:
+        """
+        Play a combat on from a snapshot, e.g. one taken of a live fight, and return the result. The combat is run
+        as if being watched, even if the snapshot was taken while units were being placed. max_duration counts from
+        the start of the original combat.
+
+        As snapshots can be pickled, many of these can be run at once in worker processes, each trying something
+        different, such as an extra unit, from the same point in the fight.
+        """
+        snapshot.restore(self)
+        self.force_idle = False
+        self.elapsed = self.tick * COMBAT_STEP
+
+        return self._run(max_duration)
+
+    def step(self, dt: float):
+        """
+        Advance the combat by a single tick.
+        """
+        self.dt = dt
+        self.elapsed += dt
+
+        self.terrain.update(dt)
+
+        self.all_entities = self.get_all_entities()
+        self.target_index.rebuild(self.all_entities)
+
+        self.units.update(dt)
+        self.projectiles.update(dt)
+
+        self.tick += 1
+
+    def check_winner(self) -> Optional[str]:
+        """
+        Return the team that has won, if either side has been wiped out.
+        """
+        player_entities = [e for e in self.all_entities if e.team == "player"]
+        if len(player_entities) == 0:
+            return "enemy"
+
+        elif len(player_entities) == len(self.all_entities):
+            return "player"
+
+        return None
+
+    def get_all_entities(self) -> List[Entity]:
+        entities = []
+        for unit in self.units.units:
+            entities += unit.entities
+        return entities
+
+    def prepare_simulation(self, seed: int, biome: str):
+        """
+        Reset to a clean combat on a new map, with the child random streams seeded from the seed.
+        """
+        self.seed = seed
+        self.biome = biome
+        self.game.rng.seed_streams(seed)
+
+        self.terrain = Terrain(self.game)
+        self.terrain.generate(biome)
+        self.units = UnitManager(self.game)
+        self.projectiles = ProjectileManager(self.game)
+
+        self.dt = 0
+        self.tick = 0
+        self.elapsed = 0
+        self.all_entities = []
+        self.last_unit_death = None
+
+    def _run(self, max_duration: float) -> Dict[str, Any]:
+        """
+        Step the combat until a team wins or max_duration is reached, and return the result.
+        """
+        winner = None
+        while self.elapsed < max_duration:
+            winner = self.check_winner()
+            if winner:
+                break
+
+            self.step(COMBAT_STEP)
+
+        return self._build_result(winner)
+
+    def _add_unit(self, unit: Unit, team: str, pos: List[float]):
+        """
+        Add a copy of a unit to the combat.
+        """
+        new_unit = Unit(self.game, unit.id, unit.type, team)
+        new_unit.modifiers = copy.deepcopy(unit.modifiers)
+        new_unit.injuries = unit.injuries
+        new_unit.pos = list(pos)
+
+        self.units.add_unit_to_combat(new_unit)
+
+    def _get_random_start_pos(self, team: str) -> List[float]:
+        """
+        Get a random position, that isn't solid, in the team's starting area.
+        """
+        width, height = self.game.window.base_resolution
+        rng = self.game.rng
+
+        if team == "player":
+            x_start = 0
+        else:
+            x_start = width // 4 * 3
+
+        while True:
+            pos = [x_start + rng.random() * (width // 4), rng.random() * height]
+            if not self.terrain.check_tile_solid(pos):
+                return pos
+
+    def _build_result(self, winner: Optional[str]) -> Dict[str, Any]:
+        units = {}
+        for unit in self.units.units:
+            units[unit.id] = {
+                "type": unit.type,
+                "team": unit.team,
+                "damage_dealt": int(unit.damage_dealt),
+                "damage_received": int(unit.damage_received),
+                "kills": unit.kills,
+                "entities_remaining": len(unit.entities),
+                "alive": bool(len(unit.entities)),
+            }
+
+        result = {
+            "winner": winner,
+            "duration": self.elapsed,
+            "units": units,
+        }
+
+        return result
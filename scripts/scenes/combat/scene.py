@@ -2,24 +2,40 @@ from __future__ import annotations
 
 import logging
 import time
-from typing import Any, Dict, List, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
 import pygame
 
 from scripts.core.base_classes.scene import Scene
-from scripts.core.constants import CombatState, PostCombatState, SceneType
+from scripts.core.constants import (
+    COMBAT_STEP,
+    CombatState,
+    FAST_FORWARD_RENDER_INTERVAL,
+    INSTANT_RESOLVE_BUDGET,
+    MAX_COMBAT_STEP_TIME,
+    PostCombatState,
+    SceneType,
+)
 from scripts.scenes.combat.elements.actions import actions
 from scripts.scenes.combat.elements.camera import Camera
 from scripts.scenes.combat.elements.card_collection import CardCollection
 from scripts.scenes.combat.elements.enemy_combatants_generator import EnemyCombatantsGenerator
+from scripts.scenes.combat.elements.entity_store import EntityStore
 from scripts.scenes.combat.elements.particles import ParticleManager
 from scripts.scenes.combat.elements.projectile_manager import ProjectileManager
+from scripts.scenes.combat.elements.push_solver import PushSolver
+from scripts.scenes.combat.elements.replay import ReplayPlayer, ReplayRecorder
+from scripts.scenes.combat.elements.target_index import TargetIndex
 from scripts.scenes.combat.elements.terrain import Terrain
 from scripts.scenes.combat.elements.unit_manager import UnitManager
+from scripts.scenes.combat.elements.win_preview import WinPreview
 from scripts.scenes.combat.ui import CombatUI
 
 if TYPE_CHECKING:
     from scripts.core.game import Game
+    from scripts.scenes.combat.elements.replay import CombatReplay
+    from scripts.scenes.combat.elements.snapshot import CombatSnapshot
+    from scripts.scenes.combat.elements.unit import Unit
 
 __all__ = ["CombatScene"]
 
@@ -44,26 +60,41 @@ class CombatScene(Scene):
         self.terrain: Terrain = Terrain(self.game)
         self.units: UnitManager = UnitManager(self.game)
         self.projectiles: ProjectileManager = ProjectileManager(self.game)
-        self.particles: ParticleManager = ParticleManager()
+        self.particles: ParticleManager = ParticleManager(self.game.rng.cosmetic)
 
         self.enemy_generator = EnemyCombatantsGenerator(self.game)
+        self.win_preview: WinPreview = WinPreview(self.game)
+        self.recorder: ReplayRecorder = ReplayRecorder(self.game)
+        self.replay_player: Optional[ReplayPlayer] = None  # set while a replay is being watched
 
         self.ui: CombatUI = CombatUI(self.game)
 
         self.actions = actions
         self.skill_cooldowns = []
+        self.biome: str = "plains"
+        self.seed: int = 0  # seed of the combat's child random streams
 
         self.state: CombatState = CombatState.UNIT_CHOOSE_CARD
 
+        self.is_headless = False
         self.combat_speed = 1
+        self.fast_forward = 1  # speed to watch combat at. Kept between combats.
         self.force_idle = True
         self.dt = 0
+        self.tick = 0  # ticks run so far this combat
+        self.step_accumulator = 0  # simulated time owed but not yet run as ticks
+        self.render_alpha = 1  # how far between the previous tick and the latest to draw entities
+        self.combat_surf: Optional[pygame.Surface] = None  # the last drawn combat, reused while fast forwarding
+        self.frames_since_combat_render = 0
         self.combat_ending_timer = -1
 
         self.last_unit_death = None
         self.end_data = None
 
         self.all_entities = None
+        self.entity_store: EntityStore = EntityStore(self.game)
+        self.push_solver: PushSolver = PushSolver(self.game)
+        self.target_index: TargetIndex = TargetIndex(self.game)
 
         self.leadership_points_spent: int = 0  # points spent to place units
         self.combat_category: str = "basic"
@@ -84,12 +115,26 @@ class CombatScene(Scene):
     def update(self, delta_time: float):
         super().update(delta_time)
 
-        self.dt = self.combat_speed * self.game.window.dt
+        # N.B. speed is set before any ticks run, so ticks don't depend on how frames happen to fall
 
-        if not self.force_idle:
-            self.terrain.update(self.dt)
+        # replays are watched at the chosen speed until they end. Idle is set by the replay.
+        if self.replay_player is not None:
+            self.combat_speed = 0 if self.replay_player.is_finished else self.fast_forward
+
+        # run at the chosen speed during watch phase
+        elif self.game.combat.state == CombatState.WATCH:
+            self.combat_speed = self.fast_forward
+            self.force_idle = False
+
+        # pause combat during unit placement
+        elif self.game.combat.state in [CombatState.UNIT_CHOOSE_CARD, CombatState.UNIT_SELECT_TARGET]:
+            self.combat_speed = 1
+            self.force_idle = True
 
-        self.particles.update(self.dt)
+        # slow down combat when playing actions
+        else:
+            self.combat_speed = 0.3
+            self.force_idle = False
 
         if self.combat_ending_timer != -1:
             self.combat_ending_timer += self.game.window.dt
@@ -120,45 +165,152 @@ class CombatScene(Scene):
                     self.game.combat.process_defeat()
                 self.game.change_scene(SceneType.POST_COMBAT)
 
+        frame_dt = self.combat_speed * self.game.window.dt
+
+        # particles are only for show so move with the frame rather than the ticks
+        self.particles.update(frame_dt)
+
+        # run the simulation in fixed ticks, so results don't depend on the frame rate
+        self.step_accumulator += frame_dt
+        deadline = time.perf_counter() + MAX_COMBAT_STEP_TIME
+        while self.step_accumulator >= COMBAT_STEP:
+            self.step_accumulator -= COMBAT_STEP
+            self.step(COMBAT_STEP)
+
+            if time.perf_counter() >= deadline:
+                # fall behind rather than trying to catch up and making the next frame slower still
+                self.step_accumulator = 0
+                break
+        self.render_alpha = self.step_accumulator / COMBAT_STEP
+
+        # estimate the outcome while units are being placed
+        if self.state in [CombatState.UNIT_CHOOSE_CARD, CombatState.UNIT_SELECT_TARGET]:
+            self.win_preview.update()
+        else:
+            self.win_preview.stop()
+
+        self.ui.update(delta_time)
+        self.ui.rebuild_ui()
+
+    def step(self, dt: float):
+        """
+        Advance the combat by a single tick.
+        """
+        self.dt = dt
+
+        if self.replay_player is not None:
+            self.replay_player.apply_events()
+        else:
+            self.recorder.record_tick()
+
+        if not self.force_idle:
+            self.terrain.update(dt)
+
         # reduce skill cooldowns
         for i in range(len(self.skill_cooldowns)):
-            self.skill_cooldowns[i] = max(self.skill_cooldowns[i] - self.dt, 0)
+            self.skill_cooldowns[i] = max(self.skill_cooldowns[i] - dt, 0)
 
-        # call once per frame instead of once per entity to save processing power
+        # call once per tick instead of once per entity to save processing power
         self.all_entities = self.get_all_entities()
+        self.target_index.rebuild(self.all_entities)
 
-        # end combat when either side is empty
-        if (self.game.combat.state not in [CombatState.UNIT_CHOOSE_CARD, CombatState.UNIT_SELECT_TARGET]) and (
-            self.combat_ending_timer == -1
+        # end combat when either side is empty. Replays aren't real combats so never end.
+        if (
+            (self.replay_player is None)
+            and (self.game.combat.state not in [CombatState.UNIT_CHOOSE_CARD, CombatState.UNIT_SELECT_TARGET])
+            and (self.combat_ending_timer == -1)
         ):
-            player_entities = [e for e in self.all_entities if e.team == "player"]
-            if len(player_entities) == 0:
+            winner = self.get_winner()
+            if winner == "enemy":
                 self.process_defeat()
 
-            elif len(player_entities) == len(self.all_entities):
+            elif winner == "player":
                 self.process_victory()
 
-        self.ui.update(delta_time)
-        self.ui.rebuild_ui()
-        self.units.update(delta_time)
-        self.projectiles.update(delta_time)
+        self.units.update(dt)
+        self.projectiles.update(dt)
 
-        # run at normal speed during watch phase
-        if self.game.combat.state == CombatState.WATCH:
-            self.combat_speed = 1
-            self.force_idle = False
+        self.tick += 1
 
-        # pause combat during unit placement
-        elif self.game.combat.state in [CombatState.UNIT_CHOOSE_CARD, CombatState.UNIT_SELECT_TARGET]:
-            self.combat_speed = 1
-            self.force_idle = True
+    def get_winner(self) -> Optional[str]:
+        """
+        Return the team that has won, if either side has been wiped out.
+        """
+        player_entities = [e for e in self.all_entities if e.team == "player"]
+        if len(player_entities) == 0:
+            return "enemy"
 
-        # slow down combat when playing actions
+        elif len(player_entities) == len(self.all_entities):
+            return "player"
+
+        return None
+
+    def resolve_instantly(self, budget: float = INSTANT_RESOLVE_BUDGET) -> Optional[str]:
+        """
+        Run the rest of the combat as fast as possible, without drawing, and end it. Returns the winning team, or None
+        if the budget, in seconds of real time, ran out first, in which case the combat carries on from where it got
+        to.
+        """
+        start_time = time.time()
+
+        self.state = CombatState.WATCH
+        self.force_idle = False
+
+        # skip purely visual work, as nothing is drawn until the end
+        self.is_headless = True
+
+        winner = None
+        while time.time() - start_time < budget:
+            self.all_entities = self.get_all_entities()
+            winner = self.get_winner()
+            if winner:
+                break
+
+            self.step(COMBAT_STEP)
+
+        self.is_headless = False
+        self.particles.count = 0
+        self.step_accumulator = 0
+        self.render_alpha = 1
+
+        if winner:
+            logging.debug(f"Resolved combat instantly in {format(time.time() - start_time, '.2f')}s. {winner} won.")
+            self.end_combat()
+            if winner == "player":
+                self.process_victory()
+            else:
+                self.process_defeat()
         else:
-            self.combat_speed = 0.3
-            self.force_idle = False
+            logging.warning("CombatScene: ran out of time resolving combat instantly. Carrying on as normal.")
+
+        return winner
 
     def render(self):
+        # while fast forwarding, only redraw the combat every few frames, to leave more time for ticks
+        self.frames_since_combat_render += 1
+        if (
+            (self.combat_surf is None)
+            or (self.combat_speed <= 1)
+            or (self.frames_since_combat_render >= FAST_FORWARD_RENDER_INTERVAL)
+        ):
+            self.combat_surf = self.render_combat()
+            self.frames_since_combat_render = 0
+
+        combat_surf = self.combat_surf
+        self.game.window.display.blit(
+            combat_surf,
+            (
+                -(combat_surf.get_width() - self.game.window.display.get_width()) // 2,
+                -(combat_surf.get_height() - self.game.window.display.get_height()) // 2,
+            ),
+        )
+
+        self.ui.render(self.game.window.display)
+
+    def render_combat(self) -> pygame.Surface:
+        """
+        Draw the terrain, units, projectiles and particles, as seen by the camera.
+        """
         self.camera.bind(self.terrain.boundaries)
         combat_surf = pygame.Surface(self.game.window.display.get_size())
         self.terrain.render(combat_surf, self.camera.render_offset())
@@ -166,30 +318,24 @@ class CombatScene(Scene):
         if self.debug_pathfinding:
             for entity in self.get_all_entities():
                 if entity.unit.default_behaviour != "swarm":
-                    if entity.behaviour.current_path and len(entity.behaviour.current_path):
+                    path = entity.behaviour.current_path
+                    if path and entity.behaviour.path_index < len(path):
                         points = [
                             (p[0] + self.camera.render_offset()[0], p[1] + self.camera.render_offset()[1])
-                            for p in ([entity.pos] + entity.behaviour.current_path)
+                            for p in ([entity.pos] + list(path[entity.behaviour.path_index :]))
                         ]
                         pygame.draw.lines(combat_surf, (255, 0, 0), False, points)
 
-        self.units.render(combat_surf, self.camera.render_offset())
-        self.projectiles.render(combat_surf, self.camera.render_offset())
+        self.units.render(combat_surf, self.camera.render_offset(), self.render_alpha)
+        self.projectiles.render(combat_surf, self.camera.render_offset(), self.render_alpha)
         self.particles.render(combat_surf, self.camera.render_offset())
         if self.camera.zoom != 1:
             combat_surf = pygame.transform.scale(
                 combat_surf,
                 (int(combat_surf.get_width() * self.camera.zoom), int(combat_surf.get_height() * self.camera.zoom)),
             )
-        self.game.window.display.blit(
-            combat_surf,
-            (
-                -(combat_surf.get_width() - self.game.window.display.get_width()) // 2,
-                -(combat_surf.get_height() - self.game.window.display.get_height()) // 2,
-            ),
-        )
 
-        self.ui.render(self.game.window.display)
+        return combat_surf
 
     def reset(self):
         self.camera = Camera()
@@ -197,14 +343,39 @@ class CombatScene(Scene):
 
         self.combat_speed = 1
         self.dt = 0
+        self.step_accumulator = 0
+        self.render_alpha = 1
+        self.combat_surf = None
+        self.replay_player = None
 
         self.state: CombatState = CombatState.UNIT_CHOOSE_CARD
 
-    def generate_combat(self, biome="plains"):
+    def prepare_simulation(self, seed: int, biome: str):
+        """
+        Clear the combat and generate a new map, with all randomness seeded from the seed.
+        """
+        self.seed = seed
+        self.biome = biome
+        self.game.rng.seed_streams(seed)
+
         self.terrain: Terrain = Terrain(self.game)
         self.terrain.generate(biome)
 
         self.units: UnitManager = UnitManager(self.game)
+        self.projectiles: ProjectileManager = ProjectileManager(self.game)
+        self.particles.count = 0
+
+        self.tick = 0
+        self.all_entities = self.get_all_entities()
+        self.last_unit_death = None
+
+    def generate_combat(self, biome="plains"):
+        self.replay_player = None
+        self.win_preview.stop()
+
+        # draw a seed for this combat from the run's rng, so the whole fight can be reproduced from it
+        self.prepare_simulation(self.game.rng.randrange(2 ** 32), biome)
+        self.recorder.start(self.seed, self.biome)
 
         self.enemy_generator = EnemyCombatantsGenerator(self.game)
 
@@ -212,8 +383,6 @@ class CombatScene(Scene):
 
         self.actions = actions
 
-        self.all_entities = self.get_all_entities()
-
         self.enemy_generator.generate()
 
         self.combat_ending_timer = -1
@@ -224,6 +393,49 @@ class CombatScene(Scene):
 
         self.leadership_points_spent = 0  # points spent to place units
 
+    def add_unit(self, unit: Unit):
+        """
+        Add a unit to the combat, at its current position.
+        """
+        self.recorder.record_unit(unit)
+        self.units.add_unit_to_combat(unit)
+
+    def use_action(self, action_type: str, pos: List[float]):
+        """
+        Use an action at the position.
+        """
+        self.recorder.record_action(action_type, pos)
+        self.actions[action_type](self.game).use(pos)
+
+    def play_replay(self, replay: CombatReplay):
+        """
+        Watch a replay in place of the current combat. The current combat can't be returned to.
+        """
+        self.recorder.stop()
+        self.win_preview.stop()
+
+        # clear the combat first, so the units in it, which are the troupe's, aren't reused for the replay's
+        self.prepare_simulation(replay.seed, replay.biome)
+        self.replay_player = ReplayPlayer(self.game, replay)
+        self.replay_player.seek(0)
+
+        self.state = CombatState.WATCH
+        self.combat_ending_timer = -1
+
+    def restore_snapshot(self, snapshot: CombatSnapshot):
+        """
+        Put the combat back to the state in the snapshot. Recording stops, as the combat no longer follows from its
+        inputs.
+
+        N.B. only the simulation is restored, so units placed since the snapshot are still counted as used.
+        """
+        self.recorder.stop()
+        snapshot.restore(self)
+
+        self.particles.count = 0
+        self.step_accumulator = 0
+        self.render_alpha = 1
+
     def end_combat(self):
         combat_end_data = []
         for unit in self.game.memory.player_troupe._units.values():
@@ -310,6 +522,7 @@ class CombatScene(Scene):
         Process the defeat, such as removing morale.
         """
         self.combat_ending_timer = 0
+        self.recorder.save()
 
         if self.combat_category == "basic":
             morale_removed = -1
@@ -328,6 +541,7 @@ class CombatScene(Scene):
         Process victory, such as preparing to move to a new level.
         """
         self.combat_ending_timer = 0
+        self.recorder.save()
 
         if self.combat_category == "basic":
             new_state = PostCombatState.VICTORY
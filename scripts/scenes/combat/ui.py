@@ -6,12 +6,12 @@ from typing import TYPE_CHECKING
 import pygame
 
 from scripts.core.base_classes.ui import UI
-from scripts.core.constants import CombatState, SceneType
+from scripts.core.constants import CombatState, FAST_FORWARD_SPEEDS, FontType, SceneType
 from scripts.core.utility import offset
 from scripts.ui_elements.tooltip import Tooltip
 
 if TYPE_CHECKING:
-    pass
+    from scripts.ui_elements.font import Font
 
 __all__ = ["CombatUI"]
 
@@ -29,6 +29,9 @@ class CombatUI(UI):
         self.button_scroll = 0
         self.shown_buttons = 4
 
+        # text is changed as results come in, rather than creating the font each frame
+        self.win_preview_font: Font = self.game.assets.create_font(FontType.DEFAULT, "", (2, 2))
+
     def update(self, delta_time: float):
         super().update(delta_time)
 
@@ -127,13 +130,13 @@ class CombatUI(UI):
                     self.game.combat.units_are_available[self.selected_col] = False
                     unit.pos = self.place_target.copy()
                     self.game.combat.leadership_points_spent += unit.tier
-                    self.game.combat.units.add_unit_to_combat(unit)
+                    self.game.combat.add_unit(unit)
 
                     logging.debug(f"Placed {unit.type}({unit.id}) at {unit.pos}.")
                 else:
                     action = self.game.combat.actions[self.game.memory.player_actions[self.selected_col]](self.game)
                     self.game.combat.skill_cooldowns[self.selected_col] = self.game.data.skills[action.type]["cooldown"]
-                    action.use(self.place_target.copy())
+                    self.game.combat.use_action(action.type, self.place_target.copy())
 
             if self.game.input.states["cancel"] or self.game.input.states["select"]:
                 # transition to appropriate state
@@ -143,10 +146,20 @@ class CombatUI(UI):
                     self.game.combat.state = CombatState.ACTION_CHOOSE_CARD
 
         elif self.game.combat.state == CombatState.WATCH:
-            if self.game.input.states["cancel"]:
+            # replays can only be watched
+            if self.game.input.states["cancel"] and self.game.combat.replay_player is None:
                 self.game.combat.state = CombatState.ACTION_CHOOSE_CARD
                 self.game.combat.start_action_phase()
 
+        if self.game.input.states["fast_forward"]:
+            self.game.input.states["fast_forward"] = False
+
+            # cycle through the speeds
+            fast_forward = self.game.combat.fast_forward
+            next_index = FAST_FORWARD_SPEEDS.index(fast_forward) + 1 if fast_forward in FAST_FORWARD_SPEEDS else 0
+            self.game.combat.fast_forward = FAST_FORWARD_SPEEDS[next_index % len(FAST_FORWARD_SPEEDS)]
+            self.set_instruction_text(f"Speed x{self.game.combat.fast_forward}.", True)
+
         if self.game.input.states["view_troupe"]:
             self.game.input.states["view_troupe"] = False
             self.game.change_scene(SceneType.VIEW_TROUPE)
@@ -240,6 +253,9 @@ class CombatUI(UI):
         self.draw_instruction(surface)
         self.draw_elements(surface)
 
+        if self.game.combat.general_state == "units":
+            self.draw_win_preview(surface)
+
         # draw selector
         if self.game.combat.state in [CombatState.UNIT_SELECT_TARGET, CombatState.ACTION_SELECT_TARGET_FREE]:
             placement_img = None
@@ -273,6 +289,30 @@ class CombatUI(UI):
             status = "select a unit or press X to end unit placement"
         elif self.game.combat.state == CombatState.ACTION_CHOOSE_CARD:
             status = "select an action or press X to watch"
+        elif self.game.combat.replay_player is not None:
+            replay_player = self.game.combat.replay_player
+            time = format(replay_player.time, ".1f")
+            duration = format(replay_player.replay.duration, ".1f")
+            status = f"watching replay. {time} of {duration} seconds"
         elif self.game.combat.state == CombatState.WATCH:
             status = "press X to use an action"
         self.set_instruction_text(status)
+
+    def draw_win_preview(self, surface: pygame.Surface):
+        """
+        Draw the estimated chance of winning with the current placement, as simulations come in.
+        """
+        preview = self.game.combat.win_preview
+        if preview.win_probability is None:
+            if not preview.is_running:
+                return
+            text = "Estimating outcome..."
+        else:
+            # N.B. the font has no percent sign
+            text = (
+                f"Win chance: {preview.win_probability:.2f} ({preview.completed}/{preview.simulations}). "
+                f"Units lost: {preview.expected_losses:.1f}"
+            )
+
+        self.win_preview_font.text = text
+        self.win_preview_font.render(surface)
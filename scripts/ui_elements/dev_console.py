@@ -4,13 +4,19 @@ import csv
 import json
 import logging
 import os
+from typing import TYPE_CHECKING
 
 import pygame
 
-from scripts.core.constants import ASSET_PATH, DATA_PATH, SceneType
+from scripts.core.constants import ASSET_PATH, COMBAT_STEP, DATA_PATH, FAST_FORWARD_SPEEDS, REPLAY_PATH, SceneType
 from scripts.core.utility import scene_to_scene_type
+from scripts.scenes.combat.elements.replay import CombatReplay
+from scripts.scenes.combat.elements.snapshot import CombatSnapshot
 from scripts.ui_elements.input_box import InputBox
 
+if TYPE_CHECKING:
+    from typing import Optional
+
 __all__ = ["DevConsole"]
 
 
@@ -20,6 +26,8 @@ class DevConsole(InputBox):
         pos = (10, 10)
         super().__init__(game, size, pos)
 
+        self.combat_snapshot: Optional[CombatSnapshot] = None  # taken by combat_snapshot, for combat_rollback
+
     def update(self, delta_time: float):
         super().update(delta_time)
 
@@ -82,6 +90,42 @@ class DevConsole(InputBox):
             if self.game.active_scene.type == SceneType.COMBAT:
                 confirmation_message = self._process_combat_result(result)
 
+        elif command[:12] == "combat_speed":
+            speed = command[13:]  # +1 position to account for space
+
+            # check active scene
+            if self.game.active_scene.type == SceneType.COMBAT:
+                confirmation_message = self._set_combat_speed(speed)
+
+        elif command[:14] == "combat_resolve":
+            # check active scene
+            if self.game.active_scene.type == SceneType.COMBAT:
+                confirmation_message = self._resolve_combat()
+
+        elif command[:13] == "combat_replay":
+            path = command[14:]  # +1 position to account for space
+
+            # check active scene
+            if self.game.active_scene.type == SceneType.COMBAT:
+                confirmation_message = self._play_replay(path)
+
+        elif command[:11] == "combat_seek":
+            seconds = command[12:]  # +1 position to account for space
+
+            # check active scene
+            if self.game.active_scene.type == SceneType.COMBAT:
+                confirmation_message = self._seek_replay(seconds)
+
+        elif command[:15] == "combat_snapshot":
+            # check active scene
+            if self.game.active_scene.type == SceneType.COMBAT:
+                confirmation_message = self._take_combat_snapshot()
+
+        elif command[:15] == "combat_rollback":
+            # check active scene
+            if self.game.active_scene.type == SceneType.COMBAT:
+                confirmation_message = self._rollback_combat()
+
         # update result
         if confirmation_message != "":
             self.game.active_scene.ui.set_instruction_text(confirmation_message, True)
@@ -267,3 +311,104 @@ class DevConsole(InputBox):
             confirmation_message = f"Result type ({result}) not recognised."
 
         return confirmation_message
+
+    def _set_combat_speed(self, speed: str) -> str:
+        """
+        Set the speed combat is watched at. Speed should be one of FAST_FORWARD_SPEEDS.
+        """
+        if speed.isdigit() and int(speed) in FAST_FORWARD_SPEEDS:
+            self.game.combat.fast_forward = int(speed)
+            confirmation_message = f"Combat speed set to x{speed}."
+
+            logging.debug(f"Set combat speed to x{speed}.")
+
+        else:
+            confirmation_message = f"Combat speed ({speed}) not recognised."
+
+        return confirmation_message
+
+    def _resolve_combat(self) -> str:
+        """
+        Play out the rest of the current combat instantly.
+        """
+        winner = self.game.combat.resolve_instantly()
+
+        if winner == "player":
+            confirmation_message = "Combat won."
+        elif winner == "enemy":
+            confirmation_message = "Combat lost."
+        else:
+            confirmation_message = "Combat took too long to resolve."
+
+        return confirmation_message
+
+    def _play_replay(self, path: str) -> str:
+        """
+        Watch a replay in place of the current combat. Plays the latest replay if no path is given.
+        """
+        if not path:
+            replays = sorted(file for file in os.listdir(REPLAY_PATH) if file.endswith(".replay"))
+            if not replays:
+                return "No replays found."
+            path = str(REPLAY_PATH / replays[-1])
+
+        try:
+            replay = CombatReplay.load(path)
+        except (OSError, ValueError) as exception:
+            logging.warning(f"DevConsole: couldn't load replay. {exception}")
+            return f"Replay ({path}) couldn't be loaded."
+
+        self.game.combat.play_replay(replay)
+        confirmation_message = f"Playing replay {os.path.basename(path)}."
+
+        logging.debug(f"Playing replay {path}.")
+
+        return confirmation_message
+
+    def _seek_replay(self, seconds: str) -> str:
+        """
+        Jump to a time, in seconds, in the replay being watched.
+        """
+        replay_player = self.game.combat.replay_player
+        if replay_player is None:
+            return "No replay is playing."
+
+        try:
+            tick = round(float(seconds) / COMBAT_STEP)
+        except ValueError:
+            return f"Time ({seconds}) not recognised."
+
+        replay_player.seek(tick)
+        confirmation_message = f"Replay at {format(replay_player.time, '.1f')}s."
+
+        logging.debug(f"Replay seeked to {replay_player.time}s.")
+
+        return confirmation_message
+
+    def _take_combat_snapshot(self) -> str:
+        """
+        Take a snapshot of the current combat, to roll back to with combat_rollback.
+        """
+        self.combat_snapshot = CombatSnapshot.capture(self.game.combat)
+        confirmation_message = f"Snapshot taken at {format(self.combat_snapshot.tick * COMBAT_STEP, '.1f')}s."
+
+        logging.debug(f"Took {self.combat_snapshot.size} byte combat snapshot at tick {self.combat_snapshot.tick}.")
+
+        return confirmation_message
+
+    def _rollback_combat(self) -> str:
+        """
+        Put the combat back to the snapshot taken with combat_snapshot.
+        """
+        if self.combat_snapshot is None:
+            return "No snapshot taken."
+
+        if self.game.combat.replay_player is not None:
+            return "Can't roll back a replay. Use combat_seek instead."
+
+        self.game.combat.restore_snapshot(self.combat_snapshot)
+        confirmation_message = f"Rolled back to {format(self.combat_snapshot.tick * COMBAT_STEP, '.1f')}s."
+
+        logging.debug(f"Rolled combat back to tick {self.combat_snapshot.tick}.")
+
+        return confirmation_message
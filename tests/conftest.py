@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from scripts.scenes.combat.elements.terrain import Terrain, TILE_SIZE
+from scripts.scenes.combat.headless import HeadlessGame
+
+
+class FakeTerrain:
+    """
+    Stands in for the Terrain with grids of tile flags but no tiles, so combat elements can be tested on made up maps.
+    Grids are [y, x] and start at origin, the loc of their first tile. Every tile is open until set otherwise.
+    """
+
+    def __init__(self, width, height, origin=(0, 0)):
+        self.tile_size = TILE_SIZE
+        self.tile_boundaries = ((origin[0], origin[0] + width - 1), (origin[1], origin[1] + height - 1))
+        self.version = 0
+
+        self.solid_grid = np.zeros((height, width), dtype=bool)
+        self.hoverable_grid = np.ones((height, width), dtype=bool)
+        self.sight_block_grid = np.zeros((height, width), dtype=bool)
+
+    def check_tile_hoverable(self, pos):
+        return bool(self.check_tiles_hoverable([pos])[0])
+
+    def check_tiles_hoverable(self, positions):
+        return Terrain._lookup_many(self, self.hoverable_grid, positions, False)
+
+
+@pytest.fixture
+def game():
+    return HeadlessGame()
+
+
+@pytest.fixture
+def fake_terrain():
+    """
+    The FakeTerrain class, to make made up maps with.
+    """
+    return FakeTerrain
+
+
+@pytest.fixture(params=range(5))
+def seed(request):
+    """
+    Seeds for tests that compare randomly generated cases against a simpler, slower way of getting the same answer.
+    """
+    return request.param
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from scripts.scenes.combat.elements.unit import Unit
+
+
+@pytest.fixture
+def combat(game):
+    game.rng.set_seed(0)
+    game.combat.prepare_simulation(0, "plains")
+    game.combat._add_unit(Unit(game, 1, "infantryman", "player"), "player", [100, 100])
+    game.combat.all_entities = game.combat.get_all_entities()
+    return game.combat
+
+
+def random_positions_near_solid_tiles(terrain, rng, count):
+    """
+    Get positions that aren't solid but are close enough to solid tiles that moving will often run in to them.
+    """
+    ys, xs = np.nonzero(terrain.solid_grid)
+    assert len(xs), "the map needs solid tiles to move in to"
+
+    positions = []
+    while len(positions) < count:
+        i = rng.integers(len(xs))
+        loc = (xs[i] + terrain.tile_boundaries[0][0], ys[i] + terrain.tile_boundaries[1][0])
+        pos = ((np.array(loc) + 0.5) * terrain.tile_size + rng.uniform(-40, 40, 2)).tolist()
+        if not terrain.check_tile_solid(pos):
+            positions.append(pos)
+    return positions
+
+
+@pytest.mark.parametrize("max_move", [4, 40])
+def test_move_matches_entity_move(combat, max_move):
+    store = combat.entity_store
+    entities = combat.all_entities
+    rng = np.random.default_rng(max_move)
+
+    for _ in range(50):
+        for entity, pos in zip(entities, random_positions_near_solid_tiles(combat.terrain, rng, len(entities))):
+            entity.pos[:] = pos
+        movement = rng.uniform(-max_move, max_move, (len(entities), 2))
+        # include movement along a single axis
+        movement[0, 0] = 0
+        movement[1, 1] = 0
+
+        expected = []
+        for entity, entity_movement in zip(entities, movement.tolist()):
+            start = entity.pos.copy()
+            entity.move(entity_movement)
+            expected.append(entity.pos.copy())
+            entity.pos[:] = start
+
+        store.sync(entities)
+        store.move(np.arange(len(entities)), movement)
+
+        assert [entity.pos for entity in entities] == expected
+        assert store.pos.tolist() == expected
+
+
+def test_sync_only_gathers_fixed_stats_for_new_entities(combat):
+    store = combat.entity_store
+    entities = combat.all_entities
+    store.sync(entities)
+    sizes = store.size
+
+    entities[0].pos[0] += 5
+    entities[1].alive = False
+    store.sync(entities)
+
+    assert store.size is sizes
+    assert store.pos[0, 0] == entities[0].pos[0]
+    assert store.alive.tolist() == [entity.alive for entity in entities]
+    assert store.team.tolist() == [store.get_team_id("player")] * len(entities)
@@ -0,0 +1,69 @@
+import pytest
+
+from scripts.scenes.combat.elements.troupe import Troupe
+
+
+def build_troupes(game):
+    player = Troupe(game, "player", [])
+    player.generate_specific_units(["conscript_bowman", "infantryman"])
+    enemy = Troupe(game, "enemy", [])
+    enemy.generate_specific_units(["goblin", "goblin"])
+    return player, enemy
+
+
+def get_troupe_state(troupe):
+    """
+    Get what combat could change on a troupe's units, in a form that can be compared.
+    """
+    return [
+        (unit.type, unit.team, unit.injuries, unit.damage_dealt, unit.kills, list(unit.pos), len(unit.entities))
+        for unit in troupe.units.values()
+    ]
+
+
+@pytest.mark.parametrize("seed", [0, 3])
+def test_same_seed_gives_same_result(game, seed):
+    player, enemy = build_troupes(game)
+    result = game.combat.simulate(player, enemy, seed=seed, max_duration=5)
+
+    # run something else in between, so nothing is carried over from the last run
+    game.combat.simulate(player, enemy, seed=seed + 1, max_duration=5)
+
+    assert game.combat.simulate(player, enemy, seed=seed, max_duration=5) == result
+
+
+def test_result_covers_every_unit(game):
+    player, enemy = build_troupes(game)
+    result = game.combat.simulate(player, enemy, max_duration=5)
+
+    assert result["winner"] in ("player", "enemy", None)
+    assert 0 < result["duration"] <= 5 + 1 / 60
+    assert set(result["units"]) == set(player.units) | set(enemy.units)
+    for troupe in (player, enemy):
+        for id_, unit in troupe.units.items():
+            assert result["units"][id_]["type"] == unit.type
+            assert result["units"][id_]["team"] == troupe.team
+            assert result["units"][id_]["alive"] == (result["units"][id_]["entities_remaining"] > 0)
+
+    if result["winner"] is not None:
+        loser = "enemy" if result["winner"] == "player" else "player"
+        assert not any(unit["alive"] for unit in result["units"].values() if unit["team"] == loser)
+
+
+def test_troupes_are_not_changed(game):
+    player, enemy = build_troupes(game)
+    before = [get_troupe_state(troupe) for troupe in (player, enemy)]
+    game.combat.simulate(player, enemy, max_duration=5)
+
+    assert [get_troupe_state(troupe) for troupe in (player, enemy)] == before
+
+
+def test_units_start_at_given_positions(game):
+    player, enemy = build_troupes(game)
+    positions = {id_: [40.0 + i * 20, 100.0] for i, id_ in enumerate(player.units)}
+    game.combat.simulate(player, enemy, positions=positions, max_duration=0)
+
+    # N.B. a unit's pos is the middle of its entities, which are spread around where it was placed
+    for unit in game.combat.units.units:
+        if unit.id in positions:
+            assert unit.pos == pytest.approx(positions[unit.id], abs=unit.entity_spread_max)
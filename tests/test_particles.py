@@ -0,0 +1,101 @@
+import math
+import random
+
+import pygame
+import pytest
+
+from scripts.scenes.combat.elements.particles import ParticleManager
+
+COLOURS = [(255, 0, 0), (0, 255, 0), (20, 40, 60)]
+
+
+class ReferenceParticles:
+    """
+    Particles as separate objects, updated one at a time, as they were before the pool.
+    """
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.particles = []  # [loc, vel, dur, colour]
+
+    def create_particle_burst(self, loc, colour, count, speed_range=[30, 60], dur_range=[0.2, 0.3]):
+        for i in range(count):
+            speed = self.rng.random() * (speed_range[1] - speed_range[0]) + speed_range[0]
+            dur = self.rng.random() * (dur_range[1] - dur_range[0]) + dur_range[0]
+            angle = self.rng.random() * math.pi * 2
+            self.particles.append([list(loc), [math.cos(angle) * speed, math.sin(angle) * speed], dur, colour])
+
+    def update(self, dt):
+        for particle in self.particles:
+            particle[0][0] += particle[1][0] * dt
+            particle[0][1] += particle[1][1] * dt
+            particle[2] -= dt
+        self.particles = [particle for particle in self.particles if particle[2] >= 0]
+
+    def render(self, surf, offset=(0, 0)):
+        for loc, _, _, colour in self.particles:
+            surf.set_at((int(loc[0] + offset[0]), int(loc[1] + offset[1])), colour)
+
+
+def play(particles, seed):
+    """
+    Create bursts of particles between updates, so they are of different ages and die at different times.
+    """
+    rng = random.Random(seed + 100)
+    for _ in range(30):
+        for _ in range(rng.randrange(3)):
+            loc = [rng.uniform(-10, 110), rng.uniform(-10, 110)]
+            particles.create_particle_burst(loc, rng.choice(COLOURS), rng.randrange(1, 20))
+        particles.update(rng.choice([1 / 60, 0.05]))
+
+
+def test_pool_matches_separate_particles(seed):
+    pool = ParticleManager(random.Random(seed))
+    reference = ReferenceParticles(random.Random(seed))
+    play(pool, seed)
+    play(reference, seed)
+
+    n = pool.count
+    assert n == len(reference.particles)
+    assert pool.loc[:n].tolist() == [loc for loc, _, _, _ in reference.particles]
+    assert pool.dur[:n].tolist() == [dur for _, _, dur, _ in reference.particles]
+    assert [pool.colours[i] for i in pool.colour[:n]] == [colour for _, _, _, colour in reference.particles]
+
+    surf = pygame.Surface((100, 100))
+    reference_surf = pygame.Surface((100, 100))
+    pool.render(surf, offset=(3, -2))
+    reference.render(reference_surf, offset=(3, -2))
+    assert pygame.image.tobytes(surf, "RGB") == pygame.image.tobytes(reference_surf, "RGB")
+
+
+def test_bursts_past_capacity_are_dropped():
+    pool = ParticleManager(random.Random(0), capacity=25)
+    pool.create_particle_burst([0, 0], COLOURS[0], 20)
+    pool.create_particle_burst([0, 0], COLOURS[1], 20)
+    assert pool.count == 25
+
+    pool.create_particle_burst([0, 0], COLOURS[2], 20)
+    assert pool.count == 25
+    assert pool.colour.tolist() == [0] * 20 + [1] * 5
+
+
+def test_all_expire(seed):
+    pool = ParticleManager(random.Random(seed))
+    pool.create_particle_burst([50, 50], COLOURS[0], 100, dur_range=[0.1, 0.3])
+    pool.update(0.2)
+    assert 0 < pool.count < 100
+    assert (pool.dur[: pool.count] >= 0).all()
+
+    pool.update(0.2)
+    assert pool.count == 0
+
+
+@pytest.mark.parametrize("offset", [(0, 0), (-200, 0)])
+def test_render_skips_particles_off_the_surface(offset):
+    pool = ParticleManager(random.Random(0))
+    pool.create_particle_burst([-5, 50], COLOURS[0], 10)
+    pool.create_particle_burst([150, 50], COLOURS[1], 10)
+
+    surf = pygame.Surface((100, 100))
+    pool.render(surf, offset)
+    assert pygame.image.tobytes(surf, "RGB") == bytes(100 * 100 * 3)
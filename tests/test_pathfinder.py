@@ -0,0 +1,116 @@
+import numpy as np
+
+from scripts.scenes.combat.elements.pathfinder import PathCache, Pathfinder
+
+WIDTH = 24
+HEIGHT = 18
+
+
+def build_pathfinder(fake_terrain, seed, wall_chance=0.25):
+    # offset from 0 so conversion between path and tile locs is covered
+    terrain = fake_terrain(WIDTH, HEIGHT, origin=(-3, 2))
+    terrain.solid_grid = np.random.default_rng(seed).random((HEIGHT, WIDTH)) < wall_chance
+
+    pathfinder = Pathfinder(terrain)
+    pathfinder.set_map(np.where(terrain.solid_grid, 0, 1).tolist())
+    return pathfinder, ~terrain.solid_grid
+
+
+def to_path_loc(pathfinder, loc):
+    boundaries = pathfinder.terrain.tile_boundaries
+    return loc[0] - boundaries[0][0], loc[1] - boundaries[1][0]
+
+
+def to_tile_loc(pathfinder, loc):
+    boundaries = pathfinder.terrain.tile_boundaries
+    return loc[0] + boundaries[0][0], loc[1] + boundaries[1][0]
+
+
+def a_star_route(pathfinder, start, end):
+    pathfinder.use_flow_fields = False
+    route = pathfinder._find_route(start, end)
+    pathfinder.use_flow_fields = True
+    return route
+
+
+def random_tiles(open_tiles, seed, count=40):
+    rng = np.random.default_rng(seed)
+    ys, xs = np.nonzero(open_tiles)
+    picks = rng.integers(0, len(xs), (count, 2))
+    return [((int(xs[a]), int(ys[a])), (int(xs[b]), int(ys[b]))) for a, b in picks]
+
+
+def test_flow_route_is_as_short_as_a_star(fake_terrain, seed):
+    pathfinder, open_tiles = build_pathfinder(fake_terrain, seed)
+
+    for start, end in random_tiles(open_tiles, seed):
+        assert len(pathfinder.flow_route(start, end)) == len(a_star_route(pathfinder, start, end))
+
+
+def test_flow_route_steps_between_adjacent_open_tiles(fake_terrain, seed):
+    pathfinder, open_tiles = build_pathfinder(fake_terrain, seed)
+
+    for start, end in random_tiles(open_tiles, seed):
+        route = pathfinder.flow_route(start, end)
+        if not route:
+            continue
+
+        previous = start
+        for loc in route:
+            x, y = to_path_loc(pathfinder, loc)
+            assert abs(x - previous[0]) + abs(y - previous[1]) == 1
+            assert open_tiles[y, x]
+            previous = (x, y)
+        assert previous == end
+
+
+def test_flow_route_to_solid_or_unreachable_tile_is_empty(fake_terrain):
+    terrain = fake_terrain(WIDTH, HEIGHT)
+    # a wall down the middle splits the map in two
+    terrain.solid_grid[:, WIDTH // 2] = True
+    pathfinder = Pathfinder(terrain)
+    pathfinder.set_map(np.where(terrain.solid_grid, 0, 1).tolist())
+
+    start = (0, 0)
+    for end in [(WIDTH - 1, 0), (WIDTH // 2, 0), (0, 0)]:
+        assert pathfinder.flow_route(start, end) == []
+        assert a_star_route(pathfinder, start, end) == []
+    assert pathfinder.flow_route(start, (-1, 0)) == []
+
+
+def test_px_route_follows_route(fake_terrain):
+    pathfinder, open_tiles = build_pathfinder(fake_terrain, 0)
+
+    for start, end in random_tiles(open_tiles, 0, 10):
+        route = pathfinder.route(start, end)
+        start_px = pathfinder.loc_to_px(to_tile_loc(pathfinder, start))
+        end_px = pathfinder.loc_to_px(to_tile_loc(pathfinder, end))
+        assert pathfinder.px_route(start_px, end_px) == tuple(pathfinder.loc_to_px(loc) for loc in route)
+
+
+def test_route_is_cached_until_terrain_changes(fake_terrain):
+    pathfinder, open_tiles = build_pathfinder(fake_terrain, 0)
+    start, end = random_tiles(open_tiles, 0, 1)[0]
+
+    route = pathfinder.route(start, end)
+    assert pathfinder.route(start, end) is route
+
+    # block the map off, without the cache knowing
+    pathfinder.set_map(np.zeros((HEIGHT, WIDTH), dtype=np.int8).tolist())
+    assert pathfinder.route(start, end) is route
+
+    pathfinder.terrain.version += 1
+    assert pathfinder.route(start, end) == ()
+
+
+def test_path_cache_drops_least_recently_used():
+    cache = PathCache(size=2)
+    cache.set("a", 0, ("a",))
+    cache.set("b", 0, ("b",))
+    cache.get("a", 0)
+    cache.set("c", 0, ("c",))
+
+    assert cache.get("a", 0) == ("a",)
+    assert cache.get("b", 0) is None
+    assert cache.get("c", 0) == ("c",)
+    assert cache.get("c", 1) is None
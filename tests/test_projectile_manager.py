@@ -0,0 +1,128 @@
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pygame
+import pytest
+
+from scripts.scenes.combat.elements.entity_store import EntityStore
+from scripts.scenes.combat.elements.projectile import Projectile
+from scripts.scenes.combat.elements.projectile_manager import ProjectileManager
+from scripts.scenes.combat.elements.terrain import TILE_SIZE
+
+MAP_SIZE = 20  # in tiles
+
+
+class FakeEntity:
+    def __init__(self, index, pos, team, hits):
+        self.index = index
+        self.pos = pos
+        self.team = team
+        self.size = 4
+        self.weight = 1
+        self.alive = True
+        self.attack = 10 + index
+        self.projectile_data = {"img": "arrow", "speed": 0}
+        self.hits = hits
+
+    def angle(self, entity):
+        return math.atan2(entity.pos[1] - self.pos[1], entity.pos[0] - self.pos[0])
+
+    def deal_damage(self, amount, owner=None):
+        self.hits.append((self.index, amount, owner.index))
+        return True, amount
+
+
+def build_combat(fake_terrain, seed, count=60, projectile_count=40, speed=(200, 900)):
+    """
+    Build a combat of fake entities, with projectiles fired between them. The same seed always builds the same combat.
+    """
+    rng = np.random.default_rng(seed)
+    hits = []
+    entities = [
+        FakeEntity(i, rng.uniform(0, MAP_SIZE * TILE_SIZE, 2).tolist(), ["player", "enemy"][i % 2], hits)
+        for i in range(count)
+    ]
+    terrain = fake_terrain(MAP_SIZE, MAP_SIZE)
+    terrain.hoverable_grid = rng.random((MAP_SIZE, MAP_SIZE)) >= 0.05
+    game = SimpleNamespace(combat=SimpleNamespace(terrain=terrain, all_entities=entities))
+    game.combat.entity_store = EntityStore(game)
+
+    projectiles = []
+    for owner_index, target_index in rng.integers(0, count, (projectile_count, 2)).tolist():
+        owner = entities[owner_index]
+        owner.projectile_data["speed"] = float(rng.uniform(*speed))
+        projectiles.append(Projectile(game, owner, entities[target_index]))
+
+    return game, projectiles, hits
+
+
+def reference_update(game, projectiles, dt):
+    """
+    Move each projectile in turn, a step at a time, checking every entity at every step, as projectiles were first
+    written to. Returns the projectiles still flying.
+    """
+    projectiles = projectiles.copy()
+    for i, projectile in sorted(enumerate(projectiles), key=lambda item: item[0], reverse=True):
+        remaining_dis = projectile.speed * dt
+        alive = True
+        while alive and remaining_dis > 0:
+            dis = min(remaining_dis, 4)
+            remaining_dis -= dis
+
+            projectile.pos[0] += math.cos(projectile.angle) * dis
+            projectile.pos[1] += math.sin(projectile.angle) * dis
+            r = pygame.Rect(projectile.pos[0] - 4, projectile.pos[1] - 4, 8, 8)
+
+            if not game.combat.terrain.check_tile_hoverable(projectile.pos):
+                alive = False
+                break
+
+            for entity in game.combat.all_entities:
+                if entity.team != projectile.owner.team:
+                    if r.collidepoint(entity.pos):
+                        entity.deal_damage(projectile.damage, projectile.owner)
+                        alive = False
+                        break
+
+        if not alive:
+            projectiles.pop(i)
+
+    return projectiles
+
+
+@pytest.mark.parametrize("dt", [1 / 60, 0.1])
+def test_swept_hits_match_stepping_each_projectile(fake_terrain, seed, dt):
+    game, projectiles, hits = build_combat(fake_terrain, seed)
+    manager = ProjectileManager(game)
+    manager.projectiles = projectiles
+    for _ in range(5):
+        manager.update(dt)
+
+    reference_game, reference_projectiles, reference_hits = build_combat(fake_terrain, seed)
+    for _ in range(5):
+        reference_projectiles = reference_update(reference_game, reference_projectiles, dt)
+
+    assert hits == reference_hits
+    assert [projectile.pos for projectile in manager.projectiles] == [
+        projectile.pos for projectile in reference_projectiles
+    ]
+
+
+def test_hits_on_step_boundaries(fake_terrain):
+    # a projectile moving along an axis lands exactly on whole pixels, where the hit box edges are
+    game, projectiles, hits = build_combat(fake_terrain, 0, count=0, projectile_count=0)
+    entities = game.combat.all_entities
+    for i, x in enumerate([100, 104, 108, 112]):
+        entities.append(FakeEntity(i, [x, 45.0], "enemy", hits))
+    owner = FakeEntity(len(entities), [80.0, 50.0], "player", hits)
+    owner.projectile_data["speed"] = 1200
+    game.combat.terrain.hoverable_grid[:] = True
+
+    manager = ProjectileManager(game)
+    manager.projectiles = [Projectile(game, owner, SimpleNamespace(pos=[200.0, 50.0]))]
+    for _ in range(3):
+        manager.update(1 / 60)
+
+    assert hits == [(0, owner.attack, owner.index)]
+    assert manager.projectiles == []
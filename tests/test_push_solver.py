@@ -0,0 +1,82 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from scripts.core.constants import PUSH_FORCE, WEIGHT_SCALE
+from scripts.scenes.combat.elements.unit import Unit
+
+UNIT_TYPES = {"player": ["infantryman", "conscript_bowman"], "enemy": ["goblin", "goblin"]}
+
+
+@pytest.fixture
+def combat(game):
+    game.rng.set_seed(0)
+    game.combat.prepare_simulation(0, "plains")
+    id_ = 0
+    for team, unit_types in UNIT_TYPES.items():
+        for unit_type in unit_types:
+            id_ += 1
+            game.combat._add_unit(Unit(game, id_, unit_type, team), team, [100, 100])
+    game.combat.all_entities = game.combat.get_all_entities()
+    return game.combat
+
+
+def reference_pushes(entities, dt):
+    """
+    Push every overlapping pair apart by checking each entity against every other. Returns the movement of each
+    entity and the (pushing, pushed) pairs.
+    """
+    movement = [[0.0, 0.0] for _ in entities]
+    pairs = []
+    for i, entity in enumerate(entities):
+        for j, other in enumerate(entities):
+            if i == j or not (entity.alive and other.alive):
+                continue
+
+            dis = math.sqrt((other.pos[0] - entity.pos[0]) ** 2 + (other.pos[1] - entity.pos[1]) ** 2)
+            combined_size = entity.size + other.size
+            if dis >= combined_size:
+                continue
+
+            angle = math.atan2(other.pos[1] - entity.pos[1], other.pos[0] - entity.pos[0])
+            force = (1 - dis / combined_size) * dt * PUSH_FORCE
+            weight = entity.weight + WEIGHT_SCALE
+            other_weight = other.weight + WEIGHT_SCALE
+            for axis, direction in enumerate((math.cos(angle), math.sin(angle))):
+                movement[j][axis] += direction * (weight / other_weight * force)
+                movement[i][axis] -= direction * (other_weight / weight * force)
+            pairs.append((i, j))
+
+    return movement, pairs
+
+
+@pytest.mark.parametrize("spread", [10, 60])
+def test_pushes_match_checking_every_pair(combat, seed, spread):
+    entities = combat.all_entities
+    rng = np.random.default_rng(seed)
+    for entity in entities:
+        entity.pos[:] = (np.array([120.0, 120.0]) + rng.uniform(-spread, spread, 2)).tolist()
+        entity.alive = bool(rng.random() > 0.1)
+    # stacked entities are pushed along the x axis
+    entities[1].pos[:] = entities[0].pos
+
+    movement, pairs = reference_pushes(entities, 1 / 60)
+    assert pairs, "the entities need to overlap"
+    expected = []
+    for entity, entity_movement in zip(entities, movement):
+        start = entity.pos.copy()
+        if any(entity_movement):
+            entity.move(entity_movement)
+        expected.append(entity.pos.copy())
+        entity.pos[:] = start
+
+    combat.push_solver.solve(1 / 60)
+
+    for entity, expected_pos in zip(entities, expected):
+        assert entity.pos == pytest.approx(expected_pos)
+
+    index = {id(entity): i for i, entity in enumerate(entities)}
+    pushed = Counter((index[id(other)], i) for i, entity in enumerate(entities) for other in entity.pushed_by_log)
+    assert pushed == Counter(pairs)
@@ -0,0 +1,131 @@
+import os
+import pickle
+import struct
+
+import pytest
+from test_snapshot import get_state, start_combat
+
+from scripts.core.constants import COMBAT_STEP
+from scripts.scenes.combat.elements.replay import (
+    CombatReplay,
+    REPLAY_MAGIC,
+    REPLAY_VERSION,
+    ReplayPlayer,
+    ReplayRecorder,
+)
+from scripts.scenes.combat.elements.unit import Unit
+from scripts.scenes.combat.headless import HeadlessCombat, HeadlessGame
+
+TICKS = 400
+LATE_UNIT_TICK = 150  # tick a unit is added part way through the combat, between keyframes
+
+
+class RecordedCombat(HeadlessCombat):
+    """
+    A HeadlessCombat that records, and plays back, replays at the start of each tick, as the CombatScene does.
+    """
+
+    def __init__(self, game):
+        super().__init__(game)
+
+        self.recorder = ReplayRecorder(game)
+        self.replay_player = None
+
+    def step(self, dt):
+        if self.replay_player is not None:
+            self.replay_player.apply_events()
+        else:
+            self.recorder.record_tick()
+
+        super().step(dt)
+
+
+@pytest.fixture(scope="module")
+def recorded():
+    """
+    Record a combat. Returns the replay and the state after each tick, indexed by tick.
+    """
+    game = HeadlessGame()
+    game.combat = RecordedCombat(game)
+    game.combat.recorder.start(3, "plains")
+    combat = start_combat(game, 3)
+    for unit in combat.units.units:
+        game.combat.recorder.record_unit(unit)
+
+    states = {0: get_state(combat)}
+    while combat.tick < TICKS:
+        if combat.tick == LATE_UNIT_TICK:
+            unit = Unit(game, 99, "infantryman", "player")
+            unit.pos = [150.0, 200.0]
+            combat.recorder.record_unit(unit)
+            combat.units.add_unit_to_combat(unit)
+        combat.step(COMBAT_STEP)
+        states[combat.tick] = get_state(combat)
+
+    return combat.recorder.stop(), states
+
+
+def test_save_and_load_round_trip(recorded, tmp_path):
+    replay, _ = recorded
+    path = str(tmp_path / "combat.replay")
+    replay.save(path)
+    loaded = CombatReplay.load(path)
+
+    assert (loaded.seed, loaded.biome, loaded.length) == (replay.seed, replay.biome, TICKS)
+    assert loaded.events == replay.events
+    assert [keyframe.tick for keyframe in loaded.keyframes] == [0, 120, 240, 360]
+    assert [keyframe.data for keyframe in loaded.keyframes] == [keyframe.data for keyframe in replay.keyframes]
+
+
+@pytest.mark.parametrize("tick", [0, 50, 120, LATE_UNIT_TICK, LATE_UNIT_TICK + 1, 300, TICKS])
+def test_seek_reproduces_the_combat(recorded, tmp_path, tick):
+    replay, states = recorded
+    path = str(tmp_path / "combat.replay")
+    replay.save(path)
+
+    # play back in another game, so nothing is carried over from recording
+    game = HeadlessGame()
+    combat = game.combat = RecordedCombat(game)
+    combat.replay_player = ReplayPlayer(game, CombatReplay.load(path))
+
+    combat.replay_player.seek(tick)
+    assert get_state(combat) == states[tick]
+
+    # and plays on the same from there, including adding the late unit
+    while combat.tick < TICKS:
+        combat.step(COMBAT_STEP)
+        assert get_state(combat) == states[combat.tick]
+    assert combat.replay_player.is_finished
+    assert any(unit.id == 99 for unit in combat.units.units)
+
+
+def write_replay(path, data, magic=REPLAY_MAGIC, version=REPLAY_VERSION):
+    with open(path, "wb") as file:
+        file.write(magic)
+        file.write(struct.pack("<H", version))
+        pickle.dump(data, file)
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = str(tmp_path / "bad.replay")
+    data = {"seed": 0, "biome": "plains", "length": 0, "events": [], "keyframes": []}
+
+    write_replay(path, data, magic=b"NOPE")
+    with pytest.raises(ValueError):
+        CombatReplay.load(path)
+
+    write_replay(path, data, version=REPLAY_VERSION + 1)
+    with pytest.raises(ValueError):
+        CombatReplay.load(path)
+
+    write_replay(path, data)
+    assert CombatReplay.load(path).biome == "plains"
+
+
+@pytest.mark.parametrize("unsafe", [os.system, pickle.loads, struct.pack])
+def test_load_refuses_anything_but_game_objects(tmp_path, unsafe):
+    path = str(tmp_path / "unsafe.replay")
+    write_replay(path, {"seed": 0, "biome": "plains", "length": 0, "events": [unsafe], "keyframes": []})
+
+    with pytest.raises(ValueError):
+        CombatReplay.load(path)
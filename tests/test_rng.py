@@ -0,0 +1,90 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from scripts.core.constants import COMBAT_STEP
+from scripts.core.rng import RNG
+from scripts.scenes.combat.elements.unit import Unit
+
+
+def draw(stream, count=20):
+    return [stream.random() for _ in range(count)]
+
+
+def test_same_seed_gives_same_values(seed):
+    first = RNG(None)
+    second = RNG(None)
+    first.set_seed(seed)
+    second.set_seed(seed)
+
+    for name in ("gameplay", "terrain", "cosmetic"):
+        assert draw(first.get_stream(name)) == draw(second.get_stream(name))
+    assert draw(first) == draw(second)
+
+
+def test_streams_are_independent(seed):
+    rng = RNG(None)
+    rng.set_seed(seed)
+    expected = draw(rng.gameplay)
+
+    rng.set_seed(seed)
+    draw(rng.cosmetic, 1000)
+    draw(rng.terrain, 3)
+    draw(rng)
+    assert draw(rng.gameplay) == expected
+
+    # and differ from each other
+    rng.set_seed(seed)
+    assert len({tuple(draw(rng.get_stream(name))) for name in ("gameplay", "terrain", "cosmetic")}) == 3
+
+
+def test_seed_streams_leaves_main_sequence_alone():
+    rng = RNG(None)
+    rng.set_seed(1)
+    expected = draw(rng)
+
+    rng.set_seed(1)
+    rng.seed_streams(2)
+    assert draw(rng) == expected
+    assert rng.stream_seed == 2
+
+
+def test_new_streams_are_seeded_from_the_stream_seed():
+    rng = RNG(None)
+    rng.seed_streams(5)
+    first = draw(rng.get_stream("new"))
+
+    other = RNG(None)
+    other.seed_streams(5)
+    draw(other.get_stream("gameplay"))
+    assert draw(other.get_stream("new")) == first
+    assert other.get_stream("new") is other.get_stream("new")
+
+
+def test_streams_are_the_same_in_other_processes():
+    # N.B. worker processes, e.g. for the win preview, have to draw the same values as the main process
+    code = "from scripts.core.rng import RNG; rng = RNG(None); rng.seed_streams(7); print(rng.gameplay.random())"
+    repo = Path(__file__).parents[1]
+    output = subprocess.run([sys.executable, "-c", code], cwd=repo, capture_output=True, text=True, check=True).stdout
+
+    rng = RNG(None)
+    rng.seed_streams(7)
+    assert float(output) == rng.gameplay.random()
+
+
+def test_cosmetic_draws_dont_change_combat(game):
+    def play(extra_cosmetic_draws):
+        combat = game.combat
+        game.rng.set_seed(0)
+        combat.prepare_simulation(0, "plains")
+        combat._add_unit(Unit(game, 1, "conscript_bowman", "player"), "player", [100, 150])
+        combat._add_unit(Unit(game, 2, "goblin", "enemy"), "enemy", [220, 150])
+        combat.all_entities = combat.get_all_entities()
+
+        for _ in range(240):
+            draw(game.rng.cosmetic, extra_cosmetic_draws)
+            combat.step(COMBAT_STEP)
+
+        return [(entity.pos, entity.health) for entity in combat.get_all_entities()]
+
+    assert play(0) == play(7)
@@ -0,0 +1,123 @@
+import pickle
+
+import pygame
+import pytest
+
+from scripts.core.constants import COMBAT_STEP
+from scripts.scenes.combat.elements.snapshot import CombatSnapshot
+from scripts.scenes.combat.elements.unit import Unit
+from scripts.scenes.combat.headless import HeadlessGame
+
+UNIT_TYPES = {
+    "player": ["conscript_bowman", "infantryman", "conscript_bowman"],
+    "enemy": ["goblin", "goblin", "conscript_bowman"],
+}
+
+
+def start_combat(game, seed):
+    """
+    Start a combat, with a few units each side, as HeadlessCombat.simulate would but without running it.
+    """
+    combat = game.combat
+    game.rng.set_seed(seed)
+    combat.prepare_simulation(seed, "plains")
+
+    id_ = 0
+    for team, unit_types in UNIT_TYPES.items():
+        for unit_type in unit_types:
+            id_ += 1
+            combat._add_unit(Unit(game, id_, unit_type, team), team, combat._get_random_start_pos(team))
+    combat.all_entities = combat.get_all_entities()
+
+    return combat
+
+
+def get_state(combat):
+    """
+    Get what changes as a combat is played, in a form that can be compared.
+    """
+    entities = [
+        (entity.pos[0], entity.pos[1], entity.health, entity.action, entity.ammo)
+        for unit in combat.units.units
+        for entity in unit.entities + unit.dead_entities
+    ]
+    projectiles = [tuple(projectile.pos) for projectile in combat.projectiles.projectiles]
+    rng = (combat.game.rng.gameplay.getstate(), combat.game.rng.cosmetic.getstate())
+    return combat.tick, entities, projectiles, rng
+
+
+def play(combat, ticks):
+    states = []
+    for _ in range(ticks):
+        combat.step(COMBAT_STEP)
+        states.append(get_state(combat))
+    return states
+
+
+@pytest.mark.parametrize("seed", [0, 3])
+def test_restore_rolls_back(game, seed):
+    combat = start_combat(game, seed)
+    play(combat, 60)
+    units = combat.units.units.copy()
+
+    snapshot = CombatSnapshot.capture(combat)
+    before = get_state(combat)
+    live = play(combat, 240)
+    assert any(projectile for _, _, projectiles, _ in live for projectile in projectiles)
+
+    snapshot.restore(combat)
+    assert get_state(combat) == before
+    assert all(restored is unit for restored, unit in zip(combat.units.units, units))
+    assert play(combat, 240) == live
+
+
+@pytest.mark.parametrize("seed", [0, 3])
+def test_pickled_snapshot_restores_in_another_game(game, seed):
+    combat = start_combat(game, seed)
+    play(combat, 60)
+
+    snapshot = pickle.loads(pickle.dumps(CombatSnapshot.capture(combat)))
+    before = get_state(combat)
+    live = play(combat, 240)
+
+    other = HeadlessGame().combat
+    snapshot.restore(other)
+    assert get_state(other) == before
+    assert play(other, 240) == live
+
+
+@pytest.mark.parametrize("seed", [0, 3])
+def test_simulate_from_matches_playing_on(game, seed):
+    combat = start_combat(game, seed)
+    play(combat, 60)
+    snapshot = CombatSnapshot.capture(combat)
+
+    # stop between ticks, so the two don't disagree on whether time is up
+    max_duration = 5 + COMBAT_STEP / 2
+    live = combat._run(max_duration)
+
+    result = HeadlessGame().combat.simulate_from(snapshot, max_duration)
+    # elapsed time is summed differently when starting part way through
+    assert result["duration"] == pytest.approx(live["duration"])
+    assert result["winner"] == live["winner"]
+    assert result["units"] == live["units"]
+
+
+def test_restored_wiped_out_unit_can_be_drawn(game):
+    # draw borders as the combat scene does
+    game.combat.is_headless = False
+    combat = start_combat(game, 0)
+
+    wiped_out = combat.units.units[0]
+    for entity in wiped_out.entities:
+        entity.deal_damage(entity.health * 1000)
+    play(combat, 1)
+    assert wiped_out.team == "player" and not wiped_out.entities
+
+    snapshot = CombatSnapshot.capture(combat)
+    snapshot.restore(combat)
+
+    surface = pygame.Surface(game.window.base_resolution)
+    for unit in combat.units.units:
+        unit.render(surface)
+    assert combat.units.units[1].border_surface is not None
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from scripts.scenes.combat.elements.spatial_hash import SpatialHash
+
+CELL_SIZE = 16
+
+
+def build_hash(seed, count=200, spread=160):
+    rng = np.random.default_rng(seed)
+    # include negative positions, as cells either side of 0 are keyed differently
+    positions = rng.uniform(-spread, spread, (count, 2))
+    spatial_hash = SpatialHash()
+    spatial_hash.rebuild(list(range(count)), positions, CELL_SIZE)
+    return spatial_hash, positions
+
+
+def brute_force_distances(positions, pos):
+    offset = positions - (pos[0], pos[1])
+    return np.sqrt(offset[:, 0] ** 2 + offset[:, 1] ** 2)
+
+
+def test_neighbour_pairs_match_brute_force(seed):
+    spatial_hash, positions = build_hash(seed)
+
+    cells = np.floor_divide(positions, CELL_SIZE).astype(np.int64)
+    expected = [
+        (i, j)
+        for i in range(len(positions))
+        for j in range(len(positions))
+        if i != j and np.abs(cells[i] - cells[j]).max() <= 1
+    ]
+
+    first, second = spatial_hash.neighbour_pairs()
+    assert list(zip(first.tolist(), second.tolist())) == expected
+
+
+def test_neighbour_pairs_include_everything_within_a_cell(seed):
+    spatial_hash, positions = build_hash(seed)
+
+    first, second = spatial_hash.neighbour_pairs()
+    pairs = set(zip(first.tolist(), second.tolist()))
+    for i, pos in enumerate(positions):
+        for j in np.flatnonzero(brute_force_distances(positions, pos) < CELL_SIZE).tolist():
+            assert i == j or (i, j) in pairs
+
+
+@pytest.mark.parametrize("radius", [5, 16, 40, 500])
+def test_within_matches_brute_force(seed, radius):
+    spatial_hash, positions = build_hash(seed)
+    rng = np.random.default_rng(seed + 100)
+
+    for pos in rng.uniform(-200, 200, (20, 2)).tolist():
+        expected = np.flatnonzero(brute_force_distances(positions, pos) < radius)
+        assert spatial_hash.within(pos, radius).tolist() == expected.tolist()
+
+
+def test_nearest_matches_brute_force(seed):
+    spatial_hash, positions = build_hash(seed, count=50)
+    rng = np.random.default_rng(seed + 100)
+
+    # include positions well outside of the entities, which need several widenings of the search
+    for pos in rng.uniform(-1000, 1000, (50, 2)).tolist():
+        dis = brute_force_distances(positions, pos)
+        index, distance = spatial_hash.nearest(pos)
+        assert index == int(np.argmin(dis))
+        assert distance == pytest.approx(dis.min())
+
+
+def test_nearest_ties_go_to_lower_index():
+    spatial_hash = SpatialHash()
+    positions = np.array([[30.0, 0.0], [-10.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+    spatial_hash.rebuild(list(range(4)), positions, CELL_SIZE)
+
+    assert spatial_hash.nearest((0, 0)) == (1, 10.0)
+
+
+def test_empty():
+    spatial_hash = SpatialHash()
+    spatial_hash.rebuild([], np.zeros((0, 2)), CELL_SIZE)
+
+    assert spatial_hash.within((0, 0), 100).tolist() == []
+    assert spatial_hash.nearest((0, 0)) == (-1, float("inf"))
+    first, second = spatial_hash.neighbour_pairs()
+    assert len(first) == len(second) == 0
@@ -0,0 +1,127 @@
+import copy
+import pickle
+
+import pytest
+
+from scripts.core.constants import StatModifiedStatus
+from scripts.scenes.combat.elements.unit import MODIFIABLE_STATS, StatModifier, Unit
+
+
+@pytest.fixture
+def unit(game):
+    return Unit(game, 1, "conscript_bowman", "player")
+
+
+def test_unmodified_stats_match_base(unit):
+    for stat in MODIFIABLE_STATS:
+        assert getattr(unit, stat) == getattr(unit, f"_{stat}")
+        assert unit.get_modified_status(stat) == StatModifiedStatus.NONE
+
+
+def test_flat_amounts_are_added_before_multipliers(unit):
+    base = unit._attack
+    unit.add_modifier("attack", 1.5, is_multiplier=True)
+    unit.add_modifier("attack", 3)
+    unit.add_modifier("attack", 2, is_multiplier=True)
+    unit.add_modifier("attack", -1)
+
+    assert unit.attack == int((base + 3 - 1) * 1.5 * 2)
+
+
+def test_stats_are_whole_numbers_except_attack_speed(unit):
+    unit.add_modifier("defence", 1.25, is_multiplier=True)
+    unit.add_modifier("attack_speed", 1.25, is_multiplier=True)
+
+    assert unit.defence == int(unit._defence * 1.25)
+    assert isinstance(unit.defence, int)
+    assert unit.attack_speed == pytest.approx(unit._attack_speed * 1.25)
+
+
+def test_remove_modifier(unit):
+    base = unit._attack
+    flat = unit.add_modifier("attack", 3)
+    multiplier = unit.add_modifier("attack", 2, is_multiplier=True)
+
+    unit.remove_modifier("attack", flat)
+    assert unit.attack == base * 2
+
+    # removing one that isn't there does nothing
+    unit.remove_modifier("attack", flat)
+    unit.remove_modifier("defence", multiplier)
+    assert unit.attack == base * 2
+
+    unit.remove_modifier("attack", multiplier)
+    assert unit.attack == base
+    assert "attack" not in unit.modifiers
+
+
+def test_timed_modifiers_expire(unit):
+    base = unit._move_speed
+    lasting = unit.add_modifier("move_speed", 5)
+    timed = unit.add_modifier("move_speed", 2, is_multiplier=True, duration=1)
+    assert unit.move_speed == (base + 5) * 2
+
+    unit.update_modifiers(0.6)
+    assert unit.move_speed == (base + 5) * 2
+    assert timed.time_remaining == pytest.approx(0.4)
+
+    unit.update_modifiers(0.6)
+    assert unit.move_speed == base + 5
+    assert unit.modifiers["move_speed"] == [lasting]
+
+
+def test_get_modified_status(unit):
+    unit.add_modifier("attack", 2)
+    unit.add_modifier("defence", 0.5, is_multiplier=True)
+    unit.add_modifier("range", 1.5, is_multiplier=True)
+    unit.add_modifier("range", -5)
+
+    assert unit.get_modified_status("attack") == StatModifiedStatus.POSITIVE
+    assert unit.get_modified_status("defence") == StatModifiedStatus.NEGATIVE
+    assert unit.get_modified_status("range") == StatModifiedStatus.POSITIVE_AND_NEGATIVE
+
+
+def test_is_positive_and_negative():
+    assert StatModifier(1).is_positive and not StatModifier(1).is_negative
+    assert StatModifier(-1).is_negative and not StatModifier(-1).is_positive
+    assert StatModifier(1.1, is_multiplier=True).is_positive
+    assert StatModifier(0.9, is_multiplier=True).is_negative
+    assert not StatModifier(0).is_positive and not StatModifier(0).is_negative
+    assert not StatModifier(1, is_multiplier=True).is_positive and not StatModifier(1, is_multiplier=True).is_negative
+
+
+def test_no_ammo_is_left_unmodified(game):
+    unit = Unit(game, 1, "skirmisher", "player")
+    assert unit._ammo == -1
+
+    unit.add_modifier("ammo", 5)
+    unit.add_modifier("ammo", 2, is_multiplier=True)
+    assert unit.ammo == -1
+
+
+def test_reset_for_combat_drops_timed_modifiers(unit):
+    lasting = unit.add_modifier("defence", 0.5, is_multiplier=True)
+    unit.add_modifier("defence", 4, duration=5)
+
+    unit.reset_for_combat()
+
+    assert unit.modifiers == {"defence": [lasting]}
+    assert unit.defence == int(unit._defence * 0.5)
+    assert unit._expiring_modifiers == []
+
+
+def test_setting_modifiers_updates_stats(game, unit):
+    unit.add_modifier("attack", 4)
+    unit.add_modifier("health", 2, is_multiplier=True, duration=5)
+
+    for modifiers in (copy.deepcopy(unit.modifiers), pickle.loads(pickle.dumps(unit.modifiers))):
+        other = Unit(game, 2, unit.type, unit.team)
+        other.modifiers = modifiers
+
+        assert other.attack == unit.attack
+        assert other.health == unit.health
+        assert len(other._expiring_modifiers) == 1
+
+        # timed modifiers set this way still expire
+        other.update_modifiers(5)
+        assert other.health == other._health
@@ -0,0 +1,70 @@
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from scripts.scenes.combat.elements.entity_store import EntityStore
+from scripts.scenes.combat.elements.target_index import TargetIndex
+
+TEAMS = ["player", "enemy", "neutral"]
+
+
+def build_index(fake_terrain, seed, count=150, spread=200):
+    """
+    Build a TargetIndex of entities in three teams. Positions are whole pixels, so there are plenty of ties.
+    """
+    rng = np.random.default_rng(seed)
+    entities = [
+        SimpleNamespace(pos=rng.integers(-spread, spread, 2).astype(float).tolist(), team=TEAMS[i % 3], size=4)
+        for i in range(count)
+    ]
+    for entity in entities:
+        entity.weight = 1
+        entity.alive = True
+
+    game = SimpleNamespace(combat=SimpleNamespace(terrain=fake_terrain(10, 10), all_entities=entities))
+    game.combat.entity_store = EntityStore(game)
+    target_index = TargetIndex(game)
+    target_index.rebuild(entities)
+
+    return target_index, entities, rng
+
+
+def dis(entity, pos):
+    return math.sqrt((entity.pos[0] - pos[0]) ** 2 + (entity.pos[1] - pos[1]) ** 2)
+
+
+def test_nearest_enemy_matches_scan(fake_terrain, seed):
+    target_index, entities, rng = build_index(fake_terrain, seed)
+
+    for pos in rng.integers(-250, 250, (100, 2)).astype(float).tolist():
+        for team in TEAMS:
+            # a scan keeps the first of any that are equally close
+            expected = None
+            for entity in entities:
+                if entity.team != team and (expected is None or dis(entity, pos) < dis(expected, pos)):
+                    expected = entity
+
+            assert target_index.nearest_enemy(pos, team) is expected
+
+
+@pytest.mark.parametrize("radius", [10, 50, 300])
+def test_enemies_within_matches_scan(fake_terrain, seed, radius):
+    target_index, entities, rng = build_index(fake_terrain, seed)
+
+    for pos in rng.integers(-250, 250, (50, 2)).astype(float).tolist():
+        for team in TEAMS:
+            expected = [id(entity) for entity in entities if entity.team != team and dis(entity, pos) < radius]
+
+            assert [id(entity) for entity in target_index.enemies_within(pos, radius, team)] == expected
+
+
+def test_no_enemies(fake_terrain):
+    target_index, entities, _ = build_index(fake_terrain, 0)
+    for entity in entities:
+        entity.team = "player"
+    target_index.rebuild(entities)
+
+    assert target_index.nearest_enemy([0, 0], "player") is None
+    assert target_index.enemies_within([0, 0], 1000, "player") == []
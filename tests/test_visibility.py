@@ -0,0 +1,67 @@
+import numpy as np
+
+from scripts.scenes.combat.elements.visibility import grid_walk, Visibility
+
+WIDTH = 30
+HEIGHT = 20
+
+
+def build_visibility(fake_terrain, seed, block_chance=0.1):
+    terrain = fake_terrain(WIDTH, HEIGHT, origin=(-5, 3))
+    terrain.sight_block_grid = np.random.default_rng(seed).random((HEIGHT, WIDTH)) < block_chance
+
+    visibility = Visibility(terrain)
+    visibility.set_map()
+    return visibility
+
+
+def random_locs(visibility, rng, count):
+    # reach a little past the grid, so lines that leave it are covered
+    (min_x, max_x), (min_y, max_y) = visibility.terrain.tile_boundaries
+    xs = rng.integers(min_x - 3, max_x + 4, count)
+    ys = rng.integers(min_y - 3, max_y + 4, count)
+    return np.stack((xs, ys), axis=1)
+
+
+def test_check_lines_matches_check_line(fake_terrain, seed):
+    visibility = build_visibility(fake_terrain, seed)
+    rng = np.random.default_rng(seed + 100)
+
+    starts = random_locs(visibility, rng, 500)
+    ends = random_locs(visibility, rng, 500)
+    # straight lines, and lines to the same tile, are walked differently so make sure there are plenty
+    ends[:100, 0] = starts[:100, 0]
+    ends[100:200, 1] = starts[100:200, 1]
+    ends[200:250] = starts[200:250]
+
+    expected = [visibility.check_line(tuple(start), tuple(end)) for start, end in zip(starts.tolist(), ends.tolist())]
+    assert visibility.check_lines(starts, ends).tolist() == expected
+
+
+def test_check_line_matches_grid_walk(fake_terrain, seed):
+    visibility = build_visibility(fake_terrain, seed)
+    rng = np.random.default_rng(seed + 100)
+
+    for start, end in zip(random_locs(visibility, rng, 200).tolist(), random_locs(visibility, rng, 200).tolist()):
+        expected = not any(visibility.is_blocked(loc) for loc in grid_walk(start, end))
+        # ask twice, so the cached answer is checked too
+        assert visibility.check_line(tuple(start), tuple(end)) == expected
+        assert visibility.check_line(tuple(start), tuple(end)) == expected
+
+
+def test_check_lines_with_no_lines(fake_terrain):
+    visibility = build_visibility(fake_terrain, 0)
+
+    assert visibility.check_lines(np.zeros((0, 2)), np.zeros((0, 2))).tolist() == []
+
+
+def test_set_map_forgets_results(fake_terrain):
+    visibility = build_visibility(fake_terrain, 0, block_chance=0)
+    start = visibility.terrain.tile_boundaries[0][0], visibility.terrain.tile_boundaries[1][0]
+    end = start[0] + 5, start[1] + 3
+    assert visibility.check_line(start, end)
+
+    visibility.terrain.sight_block_grid = np.ones((HEIGHT, WIDTH), dtype=bool)
+    visibility.set_map()
+    assert not visibility.check_line(start, end)
+    assert not visibility.check_lines([start], [end])[0]